@@ -1,7 +1,11 @@
 """
 ADDITIVE Z(n)
 """
-n = 5
+# batched, array-backed U(n) tables: see unit_group.py
+from unit_group import inverse, unit_elements
+from element_order import multiplicative_order
+# structure from the moduli alone: see direct_product.py
+from direct_product import element_order, invariant_factors
 
 def _set(x, start="...,", end=", ..."):
     output = "{" + start + str(x[0])
@@ -9,20 +13,23 @@ def _set(x, start="...,", end=", ..."):
         output += ", " + str(x[i])
     output += end + "}"
     return output
-    
-for a in range(n):
-    gen = [k*a % n for k in range(-2,n+2)]
-    unique = list(set(gen))
-    unique.sort()
-    #print("<",a,"> = ",gen)
-    #print(_set(gen))
-    print(f"<{a}> = " + _set(gen) + " = " + _set(unique,"",""))
-  
+
+# every subgroup of Z(n) and U(n), from divisors / the CRT: see subgroup_lattice.py
+def additive_subgroups(n):
+    """Lines "<a> = {...} = {...}" for every a in Z(n)."""
+    lines = []
+    for a in range(n):
+        gen = [k*a % n for k in range(-2,n+2)]
+        unique = list(set(gen))
+        unique.sort()
+        #print("<",a,"> = ",gen)
+        #print(_set(gen))
+        lines.append(f"<{a}> = " + _set(gen) + " = " + _set(unique,"",""))
+    return lines
+
 """
 MULTIPLICATIVE U(n)
 """
-import math
-n = 5
 
 def gcd(a, b):
     while b != 0:
@@ -32,48 +39,52 @@ def gcd(a, b):
 def coprime(a, b):
     return gcd(a, b) == 1
 
-def inverse(a,n):
-    for b in range(n):
-        if a*b % n == 1:
-            return b
-    return None
-
-
+def unit_powers(n):
+    """Lines listing U(n) and the powers of each unit up to its order."""
+    elements = list(unit_elements(n))
+    lines = [f"U({n}) = {_set(elements)}"]
 
-elements = [a for a in range(n) if coprime(a,n)]
-print(f"U({n}) = {_set(elements)}")
+    # need to add inverse and powers of inverse
+    for a in elements:
+        lines.append(f"\na={a}:")
+        ainv = inverse(a,n)
+        # exact integer powers; stop once a^k returns to 1
+        order = multiplicative_order(a,n)
+        gen = []
+        for k in range(0,order):
+            a_k = pow(a,k,n)
+            lines.append(f"{a}^{k} = {a**k} = {a_k} mod {n}")
+            gen.append(a_k)
 
-# need to add inverse and powers of inverse
-for a in elements:
-    print(f"\na={a}:")
-    ainv = inverse(a,n)
-    gen = []
-    for k in range(0,len(elements)):
-        a_k = int(math.pow(a,k)) % n
-        print(f"{a}^{k} = {int(math.pow(a,k))} = {a_k} mod {n}")
-        #ainv_k = int(math.pow(ainv,k)) % n
-        #if (k > 1) and (a_k % n == a):
-        #    break
-        #else:
-        gen.append(a_k)
-        #gen.append(ainv_k)
-            
-    unique = list(set(gen))
-    unique.sort()
-    print("<", a , "> =", _set(gen), "=", _set(unique) )
+        unique = list(set(gen))
+        unique.sort()
+        lines.append(f"< {a} > = {_set(gen)} = {_set(unique)}")
+    return lines
 
 """
 Zm x Zn cyclic
 """
-m = 2
-n = 4
 
-for a in range(m):
-    for b in range(n):
-        print(f"\n(a,b)=({a},{b}):")
-        gen = [(k*a % m, k*b % n) for k in range(1,m*n)]
-        for i, g in enumerate(gen):
-            print(f"{i+1}*({a} mod {m}, {b} mod {n}) = {g}")
-        unique = list(set(gen))
-        unique.sort()
-        print("<",(a,b),"> =", _set(unique))
+def product_cyclic_subgroups(m, n):
+    """Lines with the decomposition of Zm x Zn and the cyclic subgroup of every element."""
+    lines = [f"\nZ{m} x Z{n} = " + " x ".join(f"Z{d}" for d in invariant_factors([m, n]))]
+
+    for a in range(m):
+        for b in range(n):
+            lines.append(f"\n(a,b)=({a},{b}):")
+            order = element_order((a, b), (m, n))
+            gen = [(k*a % m, k*b % n) for k in range(1,order+1)]
+            for i, g in enumerate(gen):
+                lines.append(f"{i+1}*({a} mod {m}, {b} mod {n}) = {g}")
+            unique = list(set(gen))
+            unique.sort()
+            lines.append(f"< {(a, b)} > = {_set(unique)}")
+    return lines
+
+if __name__ == "__main__":
+    for line in additive_subgroups(5):
+        print(line)
+    for line in unit_powers(5):
+        print(line)
+    for line in product_cyclic_subgroups(2, 4):
+        print(line)
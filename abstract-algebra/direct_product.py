@@ -0,0 +1,224 @@
+"""
+DIRECT PRODUCTS Z(n1) x Z(n2) x ... x Z(nk)
+
+Structure of the product straight from the moduli, without listing elements:
+  invariant factors    Smith normal form of diag(n1, ..., nk) (gcd/lcm pass)
+  elementary divisors  prime powers of the invariant factors
+  element orders       lcm of n_i / gcd(a_i, n_i)
+  counts               prod gcd(d, n_i) elements have order dividing d;
+                       Moebius inversion gives the exact order, and
+                       Birkhoff's formula counts all subgroups of each p-part
+                       (summed column by column, so hundreds of factors are fine).
+"""
+from functools import lru_cache
+from math import gcd, prod
+
+from unit_group import factorize
+
+
+def _lcm(a, b):
+    return a // gcd(a, b) * b
+
+
+def smith_normal_form(moduli):
+    """
+    Diagonal of the Smith normal form of diag(moduli): d1 | d2 | ... | dk.
+    One gcd/lcm pass per position; no factoring, so huge moduli are fine.
+    """
+    d = [int(n) for n in moduli]
+    if any(n < 1 for n in d):
+        raise ValueError("moduli must be positive integers")
+    for i in range(len(d)):
+        for j in range(i + 1, len(d)):
+            if d[i] == 1:
+                break
+            g = gcd(d[i], d[j])
+            d[i], d[j] = g, d[i] // g * d[j]
+    return d
+
+
+def invariant_factors(moduli):
+    """Invariant factors (d1 | d2 | ... , all > 1) of the product."""
+    return [d for d in smith_normal_form(moduli) if d > 1]
+
+
+def elementary_divisors(moduli):
+    """Elementary divisors: sorted prime powers p^k, one per cyclic p-part."""
+    powers = []
+    for n in moduli:
+        powers.extend(p ** k for p, k in factorize(n).items())
+    return sorted(powers)
+
+
+def primary_types(moduli):
+    """Dict {p: partition} with the exponents of each p-part in decreasing order."""
+    types = {}
+    for n in moduli:
+        for p, k in factorize(n).items():
+            types.setdefault(p, []).append(k)
+    return {p: sorted(ks, reverse=True) for p, ks in sorted(types.items())}
+
+
+def group_order(moduli):
+    return prod(moduli)
+
+
+def exponent(moduli):
+    """Largest element order: lcm of the moduli."""
+    e = 1
+    for n in moduli:
+        e = _lcm(e, n)
+    return e
+
+
+def is_cyclic(moduli):
+    return len(invariant_factors(moduli)) <= 1
+
+
+def element_order(element, moduli):
+    """Order of (a1, ..., ak): lcm of n_i / gcd(a_i, n_i)."""
+    order = 1
+    for a, n in zip(element, moduli):
+        order = _lcm(order, n // gcd(a, n))
+    return order
+
+
+def _divisors(factors):
+    divs = [1]
+    for p, k in factors.items():
+        divs = [d * p ** e for d in divs for e in range(k + 1)]
+    return sorted(divs)
+
+
+def count_order_dividing(d, moduli):
+    """Number of elements x with d*x = 0."""
+    return prod(gcd(d, n) for n in moduli)
+
+
+def count_elements_of_order(d, moduli):
+    """Number of elements of order exactly d (Moebius inversion over divisors of d)."""
+    if exponent(moduli) % d != 0:
+        return 0
+    primes = list(factorize(d))
+    total = 0
+    # sum over squarefree divisors s of d of mu(s) * #{x : (d/s) x = 0}
+    for mask in range(1 << len(primes)):
+        s, sign = 1, 1
+        for i, p in enumerate(primes):
+            if mask >> i & 1:
+                s *= p
+                sign = -sign
+        total += sign * count_order_dividing(d // s, moduli)
+    return total
+
+
+def order_distribution(moduli):
+    """Dict {d: number of elements of order d} over the divisors d of the exponent."""
+    return {d: count_elements_of_order(d, moduli)
+            for d in _divisors(factorize(exponent(moduli)))}
+
+
+def _phi(d):
+    phi = d
+    for p in factorize(d):
+        phi -= phi // p
+    return phi
+
+
+def count_cyclic_subgroups(d, moduli):
+    """Number of cyclic subgroups of order d: each has phi(d) generators."""
+    return count_elements_of_order(d, moduli) // _phi(d)
+
+
+# -------------------------
+# All subgroups (Birkhoff's formula)
+# -------------------------
+
+def _conjugate(partition):
+    if not partition:
+        return []
+    return [sum(1 for part in partition if part > i) for i in range(partition[0])]
+
+
+_gaussian_rows = {}
+
+
+def _gaussian_row(n, p):
+    """[n choose k]_p for k = 0..n, from the q-Pascal rule [n,k] = [n-1,k-1] + p^k [n-1,k]."""
+    rows = _gaussian_rows.setdefault(p, [[1]])
+    while len(rows) <= n:
+        prev = rows[-1]
+        rows.append([1] + [prev[k - 1] + p ** k * prev[k] for k in range(1, len(prev))] + [1])
+    return rows[n]
+
+
+@lru_cache(maxsize=1024)
+def _count_p_subgroups(lam, p, wanted=None):
+    """
+    Subgroups (of order p^wanted, if set) of the abelian p-group of type lam.
+    Birkhoff's product only couples neighbouring columns mu'_i, mu'_(i+1) of
+    the conjugate partition, so the sum over all mu runs as a dynamic program
+    over the lam_1 columns instead of over every subpartition.
+    """
+    lam_c = _conjugate(list(lam))
+    # ways[(x, s)]: sum over columns i.. with mu'_i = x and s boxes in them (s = 0 without wanted)
+    ways = {(0, 0): 1}
+    for i in range(len(lam_c) - 1, -1, -1):
+        step = {}
+        room = sum(lam_c[:i])               # most boxes the columns left of i can add
+        for x in range(lam_c[i] + 1):
+            for (y, s), w in ways.items():
+                if y > x:
+                    continue
+                # columns 0..i-1 hold between x and lam_c[j] boxes each
+                if wanted is not None and not s + x + i * x <= wanted <= s + x + room:
+                    continue
+                term = p ** (y * (lam_c[i] - x)) * _gaussian_row(lam_c[i] - y, p)[x - y]
+                key = (x, 0 if wanted is None else s + x)
+                step[key] = step.get(key, 0) + term * w
+        ways = step
+    return sum(w for (_, s), w in ways.items() if wanted is None or s == wanted)
+
+
+def count_subgroups(moduli, order=None):
+    """
+    Number of subgroups of the product (of the given order, if order is set).
+    A subgroup is one subgroup of each p-part, so the counts multiply over primes.
+    Cost per prime is about e * r^2 products of big ints (r factors divisible by
+    p, e the largest exponent), and order adds a factor of up to e * r: 100
+    factors take well under a second, 300 factors with exponents up to 7 take
+    seconds unfiltered but minutes with order set, as the counts run to
+    thousands of digits.
+    """
+    total = 1
+    for p, lam in primary_types(moduli).items():
+        wanted = None
+        if order is not None:
+            wanted = 0
+            while order % p == 0:
+                order //= p
+                wanted += 1
+        total *= _count_p_subgroups(tuple(lam), p, wanted)
+    if order is not None and order != 1:
+        return 0
+    return total
+
+
+def describe(moduli):
+    """Dict summary of the product, in the style of the other result dicts."""
+    return {
+        "moduli": list(moduli),
+        "order": group_order(moduli),
+        "exponent": exponent(moduli),
+        "invariant_factors": invariant_factors(moduli),
+        "elementary_divisors": elementary_divisors(moduli),
+        "cyclic": is_cyclic(moduli),
+    }
+
+
+if __name__ == "__main__":
+    moduli = [2, 4, 6, 9, 10]
+    print(describe(moduli))
+    print("orders:", order_distribution(moduli))
+    print("cyclic subgroups of order 6:", count_cyclic_subgroups(6, moduli))
+    print("all subgroups:", count_subgroups(moduli))
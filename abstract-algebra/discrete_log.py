@@ -0,0 +1,148 @@
+"""
+DISCRETE LOGARITHMS IN Z(n) AND U(n)
+
+Which power of a gives b?
+  Z(n): k*a = b mod n is a linear congruence, solved directly with gcd.
+  U(n): baby-step giant-step, with the baby-step table capped at
+        max_entries, and Pohlig-Hellman so each search only runs inside
+        a subgroup of prime order.
+Prepared solvers keep their baby-step tables, so many targets with the
+same base share one precomputation (see discrete_log_many).
+"""
+from math import gcd, isqrt
+
+from unit_group import factorize, inverse
+from element_order import multiplicative_order
+
+MAX_ENTRIES = 1 << 20
+
+
+# -------------------------
+# Additive Z(n)
+# -------------------------
+
+def additive_log(a, b, n):
+    """Smallest k >= 0 with k*a = b mod n, or None if b is not in <a>."""
+    g = gcd(a % n, n)
+    if b % g != 0:
+        return None
+    m = n // g
+    return (b // g) * inverse((a // g) % m, m) % m if m > 1 else 0
+
+
+def additive_log_many(a, targets, n):
+    """additive_log for many targets, computing gcd and inverse once."""
+    g = gcd(a % n, n)
+    m = n // g
+    a_inv = inverse((a // g) % m, m) if m > 1 else 0
+    return [((b // g) * a_inv % m if m > 1 else 0) if b % g == 0 else None for b in targets]
+
+
+# -------------------------
+# Multiplicative U(n)
+# -------------------------
+
+def baby_steps(a, n, order, max_entries=MAX_ENTRIES):
+    """
+    Baby-step table {a^j: j} for j < m, m = min(ceil(sqrt(order)), max_entries),
+    with the giant-step factor a^(-m). A smaller table means more giant steps.
+    """
+    m = min(isqrt(order - 1) + 1, max_entries) if order > 1 else 1
+    table = {}
+    x = 1 % n
+    for j in range(m):
+        table.setdefault(x, j)
+        x = x * a % n
+    return {"n": n, "order": order, "m": m, "table": table, "giant": inverse(x, n)}
+
+
+def bsgs(steps, b):
+    """Smallest k in [0, order) with a^k = b mod n, using a prepared baby-step table."""
+    n, m, table, giant = steps["n"], steps["m"], steps["table"], steps["giant"]
+    gamma = b % n
+    for i in range((steps["order"] + m - 1) // m):
+        j = table.get(gamma)
+        if j is not None:
+            return i * m + j
+        gamma = gamma * giant % n
+    return None
+
+
+def _crt(residues, moduli):
+    x, m = 0, 1
+    for r, q in zip(residues, moduli):
+        x += m * ((r - x) * inverse(m % q, q) % q)
+        m *= q
+    return x % m
+
+
+def prepare_log(a, n, method="auto", max_entries=MAX_ENTRIES):
+    """
+    Precompute everything that depends only on the base a:
+    the order of a, and one baby-step table per prime of the order
+    (Pohlig-Hellman) or a single table for the whole order (method="bsgs").
+    """
+    order = multiplicative_order(a, n)
+    if order is None:
+        raise ValueError("{0} is not a unit mod {1}".format(a, n))
+    factors = factorize(order)
+    if method == "auto":
+        method = "bsgs" if len(factors) == 1 and max(factors.values()) == 1 else "pohlig-hellman"
+    solver = {"a": a % n, "n": n, "order": order, "method": method}
+    if method == "bsgs":
+        solver["steps"] = baby_steps(a, n, order, max_entries)
+    elif method == "pohlig-hellman":
+        solver["parts"] = [
+            (q, e, baby_steps(pow(a, order // q, n), n, q, max_entries))
+            for q, e in sorted(factors.items())
+        ]
+    else:
+        raise ValueError("unknown method: {0}".format(method))
+    return solver
+
+
+def solve_log(solver, b):
+    """Smallest k >= 0 with a^k = b mod n for a prepared solver, or None if b is not in <a>."""
+    n, order, a = solver["n"], solver["order"], solver["a"]
+    b %= n
+    if pow(b, order, n) != 1 % n:
+        return None
+    if solver["method"] == "bsgs":
+        return bsgs(solver["steps"], b)
+
+    residues, moduli = [], []
+    for q, e, steps in solver["parts"]:
+        # digits of x mod q^e, one prime-order search per digit
+        x, q_k = 0, 1
+        a_inv_x = 1
+        for _ in range(e):
+            h = pow(b * a_inv_x % n, order // (q_k * q), n)
+            d = bsgs(steps, h)
+            if d is None:
+                return None
+            x += d * q_k
+            q_k *= q
+            a_inv_x = inverse(pow(a, x, n), n)
+        residues.append(x)
+        moduli.append(q_k)
+    k = _crt(residues, moduli)
+    return k if pow(a, k, n) == b else None
+
+
+def discrete_log(a, b, n, method="auto", max_entries=MAX_ENTRIES):
+    """Smallest k >= 0 with a^k = b mod n, or None if b is not a power of a."""
+    return solve_log(prepare_log(a, n, method, max_entries), b)
+
+
+def discrete_log_many(a, targets, n, method="auto", max_entries=MAX_ENTRIES):
+    """discrete_log for many targets with the same base, sharing the baby-step tables."""
+    solver = prepare_log(a, n, method, max_entries)
+    return [solve_log(solver, b) for b in targets]
+
+
+if __name__ == "__main__":
+    n = 1000003
+    print(f"3^k = 5 mod 7: k = {discrete_log(3, 5, 7)}")
+    print(f"3k = 5 mod 7: k = {additive_log(3, 5, 7)}")
+    print(f"2^k = 123456 mod {n}: k = {discrete_log(2, 123456, n)}")
+    print(f"logs of 2..6 to base 2 mod {n}: {discrete_log_many(2, range(2, 7), n)}")
@@ -0,0 +1,168 @@
+"""
+ELEMENT ORDERS IN U(n)
+
+Exact modular exponentiation (pow(a, k, n)) replaces float math.pow.
+The order of a unit is found by factoring the exponent of U(n) and
+stripping prime factors, so no power loop ever runs up to |U(n)|.
+"""
+from math import gcd
+
+from unit_group import factorize, unit_elements
+
+
+def _merge(factors, more):
+    for p, k in more.items():
+        factors[p] = factors.get(p, 0) + k
+    return factors
+
+
+def phi_factorization(n):
+    """Prime factorization of phi(n), built from p^(k-1) * (p-1) without factoring phi(n) itself."""
+    factors = {}
+    for p, k in factorize(n).items():
+        if k > 1:
+            _merge(factors, {p: k - 1})
+        _merge(factors, factorize(p - 1))
+    return factors
+
+
+def carmichael_factorization(n):
+    """Prime factorization of lambda(n), the exponent of U(n); every order divides it."""
+    factors = {}
+    for p, k in factorize(n).items():
+        if p == 2:
+            part = {2: k - 2} if k >= 3 else {2: k - 1}
+        else:
+            part = _merge({p: k - 1}, factorize(p - 1))
+        for q, e in part.items():
+            if e > factors.get(q, 0):
+                factors[q] = e
+    return {q: e for q, e in factors.items() if e > 0}
+
+
+def _value(factors):
+    value = 1
+    for p, k in factors.items():
+        value *= p ** k
+    return value
+
+
+def carmichael(n):
+    """Carmichael's function lambda(n)."""
+    return _value(carmichael_factorization(n))
+
+
+def multiplicative_order(a, n, exponent_factors=None):
+    """
+    Order of a in U(n) (None if a is not a unit).
+    Start from lambda(n) and divide out each prime while a^(t/p) is still 1.
+    """
+    a %= n
+    if gcd(a, n) != 1:
+        return None
+    if exponent_factors is None:
+        exponent_factors = carmichael_factorization(n)
+    t = _value(exponent_factors)
+    for p, k in exponent_factors.items():
+        for _ in range(k):
+            if pow(a, t // p, n) != 1 % n:
+                break
+            t //= p
+    return t
+
+
+def _prime_power_orders(p, k):
+    """
+    List indexed by residue mod p^k: the order of each unit (0 for non-units).
+    One pass over the powers of a generator: g^j has order m / gcd(j, m).
+    For 2^k with k >= 3, U(2^k) = <-1> x <5> and -5^j has order lcm(2, ord 5^j).
+    """
+    pk = p ** k
+    orders = [0] * pk
+    if p == 2 and k >= 3:
+        g, m, sign = 5, pk // 4, True
+    else:
+        g, m, sign = primitive_root(pk), pk // p * (p - 1), False
+    x = 1 % pk
+    for j in range(m):
+        d = m // gcd(j, m)
+        orders[x] = d
+        if sign:
+            orders[pk - x] = d if d % 2 == 0 else 2 * d
+        x = x * g % pk
+    return orders
+
+
+def element_orders(n):
+    """
+    Dict {a: order of a} for every unit a of U(n).
+    Orders come from one pass over the powers of a primitive root of each
+    prime power p^k of n; by the CRT the order mod n is the lcm of those.
+    """
+    if n == 1:
+        return {0: 1}
+    tables = [(p ** k, _prime_power_orders(p, k)) for p, k in factorize(n).items()]
+    if len(tables) == 1:
+        orders = tables[0][1]
+        return {a: orders[a] for a in unit_elements(n)}
+    out = {}
+    for a in unit_elements(n):
+        t = 1
+        for pk, orders in tables:
+            d = orders[a % pk]
+            t = t // gcd(t, d) * d
+        out[a] = t
+    return out
+
+
+def cyclic_subgroup(a, n):
+    """<a> in U(n) as the list [a^0, a^1, ..., a^(ord-1)] mod n."""
+    order = multiplicative_order(a, n)
+    if order is None:
+        raise ValueError("{0} is not a unit mod {1}".format(a, n))
+    powers = [1 % n]
+    for _ in range(order - 1):
+        powers.append(powers[-1] * a % n)
+    return powers
+
+
+def has_primitive_root(n):
+    """U(n) is cyclic exactly for n = 1, 2, 4, p^k and 2p^k with p an odd prime."""
+    if n in (1, 2, 4):
+        return True
+    if n % 4 == 0:
+        return False
+    if n % 2 == 0:
+        n //= 2
+    return len(factorize(n)) == 1
+
+
+def primitive_root(n):
+    """Smallest generator of U(n), or None when U(n) is not cyclic."""
+    if not has_primitive_root(n):
+        return None
+    if n <= 2:
+        return n - 1
+    phi_factors = phi_factorization(n)
+    phi = _value(phi_factors)
+    for g in range(2, n):
+        if gcd(g, n) == 1 and all(pow(g, phi // p, n) != 1 for p in phi_factors):
+            return g
+    return None
+
+
+def primitive_roots(n):
+    """All generators of U(n): g^k for k coprime to phi(n)."""
+    g = primitive_root(n)
+    if g is None:
+        return []
+    phi = _value(phi_factorization(n))
+    return sorted(pow(g, k, n) for k in range(1, phi + 1) if gcd(k, phi) == 1)
+
+
+if __name__ == "__main__":
+    n = 7919 * 2
+    print(f"lambda({n}) = {carmichael(n)}, primitive root = {primitive_root(n)}")
+    orders = element_orders(n)
+    print(f"orders of the first units: {[(a, orders[a]) for a in list(orders)[:8]]}")
+    print(f"<3> mod 20 = {cyclic_subgroup(3, 20)}")
@@ -0,0 +1,406 @@
+"""
+ISOMORPHISM CLASSES OF SMALL GROUPS BY FINGERPRINT
+
+A fingerprint is a tuple of isomorphism invariants read off a Cayley table:
+  order, element-order histogram, centre size, commutator subgroup order,
+  number of conjugacy classes.
+Classification is a dict lookup of the fingerprint in a catalogue of
+small groups, so no pairwise isomorphism tests are run. The catalogue is
+built once from standard constructions, where the isomorphism tests do
+run (to merge different names for the same group), and then cached as
+JSON next to this file.
+
+The constructions do not reach every group of every order (e.g. 30 of the
+51 groups of order 32 are missing), so the number of classes found for
+each order is checked against GROUP_COUNTS, and a lookup is only reported
+as exact for orders the catalogue covers completely.
+
+Cayley tables are index matrices: table[i, j] is the index of e_i * e_j
+(as made by perm_groups.PermutationGroup.cayley_table or unit_tables.index_table).
+"""
+import json
+import os
+from math import gcd
+
+import numpy as np
+
+from perm_groups import AlternatingGroup, SymmetricGroup
+
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small_groups_catalogue.json")
+CATALOGUE_VERSION = 2
+MAX_ORDER = 32
+
+# number of groups of each order up to isomorphism (OEIS A000001)
+GROUP_COUNTS = [None, 1, 1, 1, 2, 1, 2, 1, 5, 2, 2, 1, 5, 1, 2, 1, 14,
+                1, 5, 1, 5, 2, 2, 1, 15, 2, 2, 5, 4, 1, 4, 1, 51]
+
+_catalogue = None
+
+
+# -------------------------
+# Invariants
+# -------------------------
+
+def _identity(table):
+    n = len(table)
+    return int(np.nonzero((table == np.arange(n)).all(axis=1))[0][0])
+
+
+def element_orders(table):
+    """Order of every element, all elements at once (one table lookup per power)."""
+    table = np.asarray(table)
+    n = len(table)
+    e = _identity(table)
+    idx = np.arange(n)
+    orders = np.zeros(n, dtype=np.int64)
+    power = idx.copy()
+    k = 1
+    while (orders == 0).any():
+        orders[(power == e) & (orders == 0)] = k
+        power = table[power, idx]
+        k += 1
+    return orders
+
+
+def _inverses(table, e):
+    rows, cols = np.nonzero(np.asarray(table) == e)
+    inv = np.empty(len(table), dtype=np.int64)
+    inv[rows] = cols
+    return inv
+
+
+def generated_subgroup(table, elements):
+    """Boolean mask of the subgroup generated by the given element indices."""
+    table = np.asarray(table)
+    mask = np.zeros(len(table), dtype=bool)
+    mask[_identity(table)] = True
+    mask[list(elements)] = True
+    while True:
+        members = np.nonzero(mask)[0]
+        grown = mask.copy()
+        grown[table[np.ix_(members, members)].ravel()] = True
+        if grown.sum() == mask.sum():
+            return mask
+        mask = grown
+
+
+def centre_size(table):
+    table = np.asarray(table)
+    return int((table == table.T).all(axis=1).sum())
+
+
+def commutator_subgroup_order(table):
+    table = np.asarray(table)
+    n = len(table)
+    inv = _inverses(table, _identity(table))
+    a, b = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    commutators = np.unique(table[table[table[inv[a], inv[b]], a], b])
+    return int(generated_subgroup(table, commutators).sum())
+
+
+def conjugacy_class_count(table):
+    table = np.asarray(table)
+    n = len(table)
+    inv = _inverses(table, _identity(table))
+    # column x holds g x g^-1 for every g
+    conjugates = table[table[np.arange(n)[:, None], np.arange(n)[None, :]], inv[:, None]]
+    return len({frozenset(col) for col in conjugates.T.tolist()})
+
+
+def fingerprint(table):
+    """Canonical invariant tuple for the group with this Cayley table."""
+    table = np.asarray(table)
+    orders, counts = np.unique(element_orders(table), return_counts=True)
+    return (
+        len(table),
+        tuple(zip(orders.tolist(), counts.tolist())),
+        centre_size(table),
+        commutator_subgroup_order(table),
+        conjugacy_class_count(table),
+    )
+
+
+def fingerprint_key(fp):
+    """String form of a fingerprint, used as the catalogue's hash key."""
+    order, hist, centre, commutator, classes = fp
+    return "{0}|{1}|{2}|{3}|{4}".format(
+        order, ",".join("{0}:{1}".format(o, c) for o, c in hist), centre, commutator, classes)
+
+
+# -------------------------
+# Isomorphism test (only used while building the catalogue)
+# -------------------------
+
+def _generators(table, orders):
+    gens = []
+    mask = generated_subgroup(table, [])
+    for x in np.argsort(-orders, kind="stable").tolist():
+        if not mask[x]:
+            gens.append(x)
+            mask = generated_subgroup(table, gens)
+    return gens
+
+
+def _extend_map(t1, t2, gens, images, e1, e2):
+    n = len(t1)
+    phi = np.full(n, -1, dtype=np.int64)
+    phi[e1] = e2
+    frontier = [e1]
+    while frontier:
+        nxt = []
+        for h in frontier:
+            for g, image in zip(gens, images):
+                hg = t1[h, g]
+                value = t2[phi[h], image]
+                if phi[hg] == -1:
+                    phi[hg] = value
+                    nxt.append(hg)
+                elif phi[hg] != value:
+                    return None
+        frontier = nxt
+    if (phi < 0).any() or len(set(phi.tolist())) != n:
+        return None
+    if not (phi[t1] == t2[phi[:, None], phi[None, :]]).all():
+        return None
+    return phi
+
+
+def is_isomorphic(t1, t2):
+    """Brute-force isomorphism test: map a small generating set, extend, verify."""
+    t1, t2 = np.asarray(t1), np.asarray(t2)
+    if fingerprint(t1) != fingerprint(t2):
+        return False
+    o1, o2 = element_orders(t1), element_orders(t2)
+    gens = _generators(t1, o1)
+    e1, e2 = _identity(t1), _identity(t2)
+    candidates = [np.nonzero(o2 == o1[g])[0].tolist() for g in gens]
+
+    def search(i, images):
+        if i == len(gens):
+            return _extend_map(t1, t2, gens, images, e1, e2) is not None
+        return any(search(i + 1, images + [c]) for c in candidates[i])
+
+    return search(0, [])
+
+
+# -------------------------
+# Small-group constructions
+# -------------------------
+
+def cyclic_table(n):
+    idx = np.arange(n)
+    return (idx[:, None] + idx[None, :]) % n
+
+
+def product_table(t1, t2):
+    """Cayley table of the direct product; (i, j) has index i * len(t2) + j."""
+    n1, n2 = len(t1), len(t2)
+    t = np.asarray(t1)[:, None, :, None] * n2 + np.asarray(t2)[None, :, None, :]
+    return t.reshape(n1 * n2, n1 * n2)
+
+
+def metacyclic_table(m, n, r):
+    """Z_m : Z_n with b a b^-1 = a^r, elements a^i b^j at index i * n + j."""
+    i, j = np.divmod(np.arange(m * n), n)
+    twist = np.array([pow(r, int(k), m) for k in range(n)])
+    a = (i[:, None] + twist[j][:, None] * i[None, :]) % m
+    b = (j[:, None] + j[None, :]) % n
+    return a * n + b
+
+
+def dicyclic_table(k):
+    """Dic_k of order 4k: a^(2k) = 1, x^2 = a^k, x a x^-1 = a^-1; a^i x^s at index 2i + s."""
+    m = 2 * k
+    i, s = np.divmod(np.arange(2 * m), 2)
+    i1, s1 = i[:, None], s[:, None]
+    i2, s2 = i[None, :], s[None, :]
+    exp = np.where(s1 == 0, i1 + i2, i1 - i2) + np.where((s1 == 1) & (s2 == 1), k, 0)
+    return (exp % m) * 2 + (s1 + s2) % 2
+
+
+def dihedral_table(n):
+    return metacyclic_table(n, 2, n - 1)
+
+
+def _abelian_types(limit):
+    """Invariant-factor lists d1 | d2 | ... with product <= limit."""
+    out = []
+
+    def build(factors, prod):
+        out.append(factors)
+        last = factors[-1] if factors else None
+        for d in range(2, limit // prod + 1):
+            if last is None or d % last == 0:
+                build(factors + [d], prod * d)
+
+    build([], 1)
+    return out
+
+
+def _abelian_table(factors):
+    table = cyclic_table(1)
+    for d in factors:
+        table = product_table(table, cyclic_table(d))
+    return table
+
+
+def _abelian_name(factors):
+    return " x ".join("Z{0}".format(d) for d in reversed(factors)) or "Z1"
+
+
+def small_group_constructions(max_order=MAX_ORDER):
+    """Yield (name, Cayley table) for the standard families up to max_order."""
+    abelian = [(f, _abelian_name(f)) for f in _abelian_types(max_order)]
+    for factors, name in abelian:
+        yield name, _abelian_table(factors)
+
+    nonabelian = []
+    for n in range(3, max_order // 2 + 1):
+        nonabelian.append(("D{0}".format(n), dihedral_table(n)))
+    for k in range(2, max_order // 4 + 1):
+        nonabelian.append(("Q8" if k == 2 else "Dic{0}".format(k), dicyclic_table(k)))
+    for m in range(3, max_order + 1):
+        for n in range(2, max_order // m + 1):
+            for r in range(2, m):
+                if gcd(r, m) == 1 and pow(r, n, m) == 1:
+                    nonabelian.append(("Z{0}:Z{1}({2})".format(m, n, r), metacyclic_table(m, n, r)))
+    for name, G in (("A4", AlternatingGroup(4)), ("S4", SymmetricGroup(4)), ("A5", AlternatingGroup(5))):
+        if G.order() <= max_order:
+            nonabelian.append((name, G.cayley_table().table))
+
+    for name, table in nonabelian:
+        yield name, table
+        for factors, aname in abelian:
+            if factors and len(table) * _product(factors) <= max_order:
+                yield name + " x " + aname, product_table(table, _abelian_table(factors))
+
+
+def _product(values):
+    out = 1
+    for v in values:
+        out *= v
+    return out
+
+
+def build_catalogue(max_order=MAX_ORDER):
+    """
+    {fingerprint key: [[name, alias, ...], ...]}: one inner list per
+    isomorphism class, so a key with two lists is a fingerprint collision.
+    """
+    classes = {}
+    for name, table in small_group_constructions(max_order):
+        key = fingerprint_key(fingerprint(table))
+        for entry in classes.setdefault(key, []):
+            if is_isomorphic(entry["table"], table):
+                entry["names"].append(name)
+                break
+        else:
+            classes[key].append({"names": [name], "table": table})
+    return {key: [entry["names"] for entry in entries] for key, entries in sorted(classes.items())}
+
+
+def load_catalogue(path=CATALOGUE_PATH, max_order=MAX_ORDER):
+    """Read the catalogue from disk, rebuilding and saving it if missing or stale."""
+    global _catalogue
+    if _catalogue is not None and _catalogue["max_order"] >= max_order:
+        return _catalogue
+    try:
+        with open(path) as fp:
+            data = json.load(fp)
+        if data.get("version") != CATALOGUE_VERSION or data.get("max_order", 0) < max_order:
+            raise ValueError("stale catalogue")
+    except (OSError, ValueError):
+        data = {"version": CATALOGUE_VERSION, "max_order": max_order,
+                "groups": build_catalogue(max_order)}
+        with open(path, "w") as fp:
+            json.dump(data, fp, indent=1, sort_keys=True)
+    _catalogue = data
+    return data
+
+
+def class_counts(catalogue):
+    """{order: number of isomorphism classes in the catalogue}."""
+    counts = {}
+    for key, entries in catalogue["groups"].items():
+        order = int(key.split("|")[0])
+        counts[order] = counts.get(order, 0) + len(entries)
+    return counts
+
+
+def check_catalogue(catalogue):
+    """
+    {order: (catalogued, known)} for every order up to max_order with groups missing.
+    More classes than there are groups means a bad merge, so that raises ValueError.
+    """
+    counts = class_counts(catalogue)
+    missing = {}
+    for order in range(1, min(catalogue["max_order"], len(GROUP_COUNTS) - 1) + 1):
+        found, known = counts.get(order, 0), GROUP_COUNTS[order]
+        if found > known:
+            raise ValueError("catalogue has {0} classes of order {1}, but there are only {2} groups"
+                             .format(found, order, known))
+        if found < known:
+            missing[order] = (found, known)
+    return missing
+
+
+def complete_orders(catalogue):
+    """Orders whose groups are all in the catalogue."""
+    missing = check_catalogue(catalogue)
+    limit = min(catalogue["max_order"], len(GROUP_COUNTS) - 1)
+    return {order for order in range(1, limit + 1) if order not in missing}
+
+
+# -------------------------
+# Classification
+# -------------------------
+
+def classify(table, catalogue=None):
+    """
+    Look up the isomorphism class of a Cayley table.
+    Returns dict: fingerprint key, candidate classes (lists of names),
+    'complete' when every group of this order is catalogued, and 'exact'
+    when the order is complete and exactly one class has this fingerprint.
+    'name' is only set for exact matches; otherwise the group may be one
+    the catalogue does not list.
+    """
+    if catalogue is None:
+        catalogue = load_catalogue()
+    complete = catalogue.get("complete_orders")
+    if complete is None:
+        complete = catalogue["complete_orders"] = complete_orders(catalogue)
+    fp = fingerprint(table)
+    key = fingerprint_key(fp)
+    candidates = catalogue["groups"].get(key, [])
+    exact = fp[0] in complete and len(candidates) == 1
+    return {"key": key, "name": candidates[0][0] if exact else None, "candidates": candidates,
+            "complete": fp[0] in complete, "exact": exact}
+
+
+def classify_group(G, catalogue=None):
+    """classify() for a perm_groups.PermutationGroup (or anything with cayley_table().table)."""
+    return classify(G.cayley_table().table, catalogue)
+
+
+def group_by_class(tables):
+    """Bucket many Cayley tables by fingerprint: {key: [indices]}."""
+    buckets = {}
+    for i, table in enumerate(tables):
+        buckets.setdefault(fingerprint_key(fingerprint(table)), []).append(i)
+    return buckets
+
+
+if __name__ == "__main__":
+    from perm_groups import (CyclicPermutationGroup, DihedralGroup, QuaternionGroup,
+                             direct_product_permgroups)
+
+    groups = [
+        CyclicPermutationGroup(8),
+        direct_product_permgroups([CyclicPermutationGroup(4), CyclicPermutationGroup(2)]),
+        direct_product_permgroups([CyclicPermutationGroup(2)] * 3),
+        DihedralGroup(4),
+        QuaternionGroup(),
+    ]
+    for G in groups:
+        result = classify_group(G)
+        print(G, "->", result["name"] or result["candidates"])
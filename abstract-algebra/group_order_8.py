@@ -1,6 +1,12 @@
 # Sage only: sagecell.sagemath.org/
 # https://doc.sagemath.org/html/en/thematic_tutorials/group_theory.html#groups-of-small-order-as-permutation-groups
 # groups of order 8
+# Outside Sage the same constructors come from perm_groups.py (needs NumPy)
+try:
+    CyclicPermutationGroup
+except NameError:
+    from perm_groups import (CyclicPermutationGroup, DihedralGroup, QuaternionGroup,
+                             direct_product_permgroups)
 
 G1 = CyclicPermutationGroup(8)                   #Cyclic
 
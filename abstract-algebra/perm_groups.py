@@ -0,0 +1,329 @@
+"""
+PERMUTATION GROUPS WITHOUT SAGE
+
+Local stand-ins for the Sage constructors used in group_order_8.py.
+  permutations   contiguous NumPy integer arrays on points 0..d-1
+                 (printed 1-based in cycle notation, like Sage)
+  products       g*h means "apply g, then h", so g*h is the array h[g]
+  closure        Schreier-Sims base and strong generating set; the order
+                 and membership tests never list the elements
+  Cayley tables  index matrices built a row at a time by looking up the
+                 images of the base points
+
+Schreier-Sims handles groups of order ~10^5 and beyond. A Cayley table
+has order^2 entries, so keep those to groups of a few thousand elements.
+"""
+import io
+import sys
+
+import numpy as np
+
+from unit_tables import letter_names, write_operation_table
+
+
+# -------------------------
+# Permutation arrays
+# -------------------------
+
+def identity(degree):
+    return np.arange(degree, dtype=np.intp)
+
+
+def compose(g, h):
+    """g*h: apply g, then h."""
+    return h[g]
+
+
+def invert(g):
+    inv = np.empty_like(g)
+    inv[g] = np.arange(len(g), dtype=g.dtype)
+    return inv
+
+
+def from_cycles(cycles, degree):
+    """Permutation array from 1-based cycles, e.g. [(1, 2, 3), (4, 5)]."""
+    g = identity(degree)
+    for cycle in cycles:
+        for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+            g[a - 1] = b - 1
+    return g
+
+
+def parse_cycles(text):
+    """Sage-style cycle string '(1,2,3)(4,5)' -> [(1, 2, 3), (4, 5)]."""
+    cycles = []
+    for part in text.replace(" ", "").split(")"):
+        part = part.lstrip("(")
+        if part:
+            cycles.append(tuple(int(x) for x in part.split(",")))
+    return cycles
+
+
+def cycle_string(g):
+    """1-based cycle notation of g, '()' for the identity."""
+    seen = np.zeros(len(g), dtype=bool)
+    out = ""
+    for start in range(len(g)):
+        if seen[start] or g[start] == start:
+            continue
+        cycle = []
+        x = start
+        while not seen[x]:
+            seen[x] = True
+            cycle.append(str(x + 1))
+            x = g[x]
+        out += "(" + ",".join(cycle) + ")"
+    return out or "()"
+
+
+# -------------------------
+# Schreier-Sims
+# -------------------------
+
+def _strip(levels, g, start=0):
+    """Sift g down the stabilizer chain; return (residue, level where it stopped)."""
+    for i in range(start, len(levels)):
+        level = levels[i]
+        beta = int(g[level["base"]])
+        if beta not in level["orbit"]:
+            return g, i
+        g = level["inverse"][beta][g]
+    return g, len(levels)
+
+
+def _extend_orbit(level, gens):
+    """Grow the orbit of the base point under gens, keeping existing transversal entries."""
+    orbit, inverse = level["orbit"], level["inverse"]
+    queue = list(orbit)
+    while queue:
+        beta = queue.pop()
+        u = orbit[beta]
+        for s in gens:
+            gamma = int(s[beta])
+            if gamma not in orbit:
+                orbit[gamma] = s[u]
+                inverse[gamma] = invert(orbit[gamma])
+                queue.append(gamma)
+
+
+def _new_level(base, degree):
+    e = identity(degree)
+    return {"base": base, "gens": [], "orbit": {base: e}, "inverse": {base: e}, "checked": set()}
+
+
+def schreier_sims(gens, degree):
+    """
+    Base and strong generating set for <gens> (Holt's SCHREIERSIMS).
+    Returns the list of levels; level i holds base point b_i, the strong
+    generators fixing b_0..b_(i-1), and the orbit of b_i with transversal.
+    """
+    levels = []
+    e = identity(degree)
+    for g in gens:
+        g = np.asarray(g, dtype=np.intp)
+        if np.array_equal(g, e):
+            continue
+        if not levels:
+            levels.append(_new_level(int(np.nonzero(g != e)[0][0]), degree))
+        levels[0]["gens"].append(g)
+    if not levels:
+        return levels
+    for level in levels:
+        _extend_orbit(level, level["gens"])
+
+    i = len(levels) - 1
+    while i >= 0:
+        level = levels[i]
+        added = False
+        for beta in list(level["orbit"]):
+            for k, s in enumerate(level["gens"]):
+                if (beta, k) in level["checked"]:
+                    continue
+                level["checked"].add((beta, k))
+                gamma = int(s[beta])
+                schreier = level["inverse"][gamma][s[level["orbit"][beta]]]
+                h, j = _strip(levels, schreier, i + 1)
+                if np.array_equal(h, e):
+                    continue
+                if j == len(levels):
+                    levels.append(_new_level(int(np.nonzero(h != e)[0][0]), degree))
+                for lvl in levels[i + 1:j + 1]:
+                    lvl["gens"].append(h)
+                    _extend_orbit(lvl, lvl["gens"])
+                i = j
+                added = True
+                break
+            if added:
+                break
+        if not added:
+            i -= 1
+    return levels
+
+
+# -------------------------
+# Groups
+# -------------------------
+
+class PermutationGroup:
+    """Group generated by permutations (arrays, or Sage-style cycle strings/lists)."""
+
+    def __init__(self, gens, degree=None):
+        cycles = [parse_cycles(g) if isinstance(g, str) else g for g in gens]
+        if degree is None:
+            degree = max([len(g) for g in cycles if isinstance(g, np.ndarray)]
+                         + [max(c) for g in cycles if not isinstance(g, np.ndarray) for c in g if c]
+                         + [1])
+        self._degree = degree
+        self._gens = [g.astype(np.intp) if isinstance(g, np.ndarray) else from_cycles(g, degree)
+                      for g in cycles]
+        self._levels = None
+        self._elements = None
+
+    def degree(self):
+        return self._degree
+
+    def gens(self):
+        return list(self._gens)
+
+    def levels(self):
+        if self._levels is None:
+            self._levels = schreier_sims(self._gens, self._degree)
+        return self._levels
+
+    def base(self):
+        return [level["base"] for level in self.levels()]
+
+    def order(self):
+        order = 1
+        for level in self.levels():
+            order *= len(level["orbit"])
+        return order
+
+    def __contains__(self, g):
+        if isinstance(g, str):
+            g = from_cycles(parse_cycles(g), self._degree)
+        h, _ = _strip(self.levels(), np.asarray(g, dtype=np.intp))
+        return bool(np.array_equal(h, identity(self._degree)))
+
+    def is_abelian(self):
+        return all(np.array_equal(compose(g, h), compose(h, g))
+                   for g in self._gens for h in self._gens)
+
+    def elements(self):
+        """All elements as an (order x degree) array, identity first, in lexicographic order."""
+        if self._elements is None:
+            elems = identity(self._degree)[None, :]
+            for level in reversed(self.levels()):
+                transversal = np.stack(list(level["orbit"].values()))
+                # every product e*u with e from the deeper stabilizer, u a coset representative
+                elems = transversal[:, elems].reshape(-1, self._degree)
+            self._elements = elems[np.lexsort(elems.T[::-1])]
+        return self._elements
+
+    def list(self):
+        return [cycle_string(g) for g in self.elements()]
+
+    def _lookup(self):
+        """Key every element by the images of the base points."""
+        base = np.array(self.base(), dtype=np.intp)
+        keys = self.elements()[:, base]
+        if self._degree ** max(len(base), 1) < 2 ** 62:
+            keys = keys.astype(np.int64) @ (self._degree ** np.arange(len(base), dtype=np.int64))
+        else:
+            keys = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.itemsize * len(base)))).ravel()
+        order = np.argsort(keys, kind="stable")
+        return base, keys, order
+
+    def cayley_rows(self):
+        """Yield the Cayley table one row (array of element indices) at a time."""
+        elems = self.elements()
+        base, keys, order = self._lookup()
+        sorted_keys = keys[order]
+        radix = self._degree ** np.arange(len(base), dtype=np.int64)
+        for a in elems:
+            # (a*g)[base] = g[a[base]], so only the base images are needed
+            row_keys = elems[:, a[base]]
+            if keys.dtype == np.int64:
+                row_keys = row_keys.astype(np.int64) @ radix
+            else:
+                row_keys = np.ascontiguousarray(row_keys).view(keys.dtype).ravel()
+            yield order[np.searchsorted(sorted_keys, row_keys)]
+
+    def cayley_table(self):
+        return CayleyTable(np.stack(list(self.cayley_rows())), self.list())
+
+    def __repr__(self):
+        return "Permutation Group with generators [{0}]".format(
+            ", ".join(cycle_string(g) for g in self._gens))
+
+
+class CayleyTable:
+    """Cayley table as an index matrix; prints like Sage's OperationTable with letters."""
+
+    def __init__(self, table, elements):
+        self.table = table
+        self.elements = elements
+
+    def __str__(self):
+        out = io.StringIO()
+        self.write(out)
+        return out.getvalue().rstrip("\n")
+
+    def write(self, fp=sys.stdout):
+        write_operation_table(letter_names(len(self.elements)), self.table.tolist(), fp)
+
+
+# -------------------------
+# Sage-named constructors (points are 1-based in cycle notation)
+# -------------------------
+
+def CyclicPermutationGroup(n):
+    return PermutationGroup([[tuple(range(1, n + 1))]], n)
+
+
+def DihedralGroup(n):
+    """Symmetries of the n-gon, order 2n (Klein four-group for n = 2, as in Sage)."""
+    if n == 1:
+        return PermutationGroup([[(1, 2)]], 2)
+    if n == 2:
+        return PermutationGroup([[(1, 2)], [(3, 4)]], 4)
+    flip = [(i, n + 1 - i) for i in range(1, n // 2 + 1)]
+    return PermutationGroup([[tuple(range(1, n + 1))], flip], n)
+
+
+def QuaternionGroup():
+    return PermutationGroup(["(1,2,3,4)(5,6,7,8)", "(1,5,3,7)(2,8,4,6)"], 8)
+
+
+def SymmetricGroup(n):
+    if n < 2:
+        return PermutationGroup([], max(n, 1))
+    return PermutationGroup([[tuple(range(1, n + 1))], [(1, 2)]], n)
+
+
+def AlternatingGroup(n):
+    if n < 3:
+        return PermutationGroup([], max(n, 1))
+    return PermutationGroup([[(i, i + 1, i + 2)] for i in range(1, n - 1)], n)
+
+
+def direct_product_permgroups(groups):
+    """Direct product acting on the disjoint union of the groups' points."""
+    degree = sum(G.degree() for G in groups)
+    gens = []
+    offset = 0
+    for G in groups:
+        for g in G.gens():
+            full = identity(degree)
+            full[offset:offset + G.degree()] = g + offset
+            gens.append(full)
+        offset += G.degree()
+    return PermutationGroup(gens, degree)
+
+
+if __name__ == "__main__":
+    G = direct_product_permgroups([CyclicPermutationGroup(4), CyclicPermutationGroup(2)])
+    print(G, "has order", G.order())
+    print(QuaternionGroup().cayley_table())
+    S8 = SymmetricGroup(8)
+    print("S8 order:", S8.order(), "base:", S8.base())
@@ -0,0 +1,343 @@
+"""
+SUBGROUP LATTICES OF Z(n) AND U(n)
+
+Every subgroup is written down from the structure of the group, never by
+generating <a> for each element:
+  Z(n)  one subgroup <n/d> of order d for each divisor d of n; H <= K
+        exactly when |H| divides |K|.
+  U(n)  the CRT splits U(n) into cyclic factors (a primitive root for each
+        odd p^k, -1 and 5 for 2^k), so U(n) = Z(m1) x ... x Z(mr). A
+        subgroup is one subgroup of each q-primary part Z(q^e1) x ... x
+        Z(q^er), and those correspond to the lattices L <= M <= Z^r with
+        L = diag(q^e1, ..., q^er); each M is listed once by its Hermite
+        normal form, row by row from the bottom, keeping a row only when
+        q^ek * e_k stays in M, so no candidate is a dead end.
+The iterators are lazy, and factorizations and divisor lists are cached,
+so moduli up to 10^12 are fine as long as the subgroups are consumed as
+they come. The *_lattice functions return nodes plus covering edges
+(lower, upper, prime index) for export with lattice_dot or lattice_json.
+"""
+import json
+from functools import lru_cache
+
+from unit_group import factorize, inverse
+from element_order import primitive_root
+from direct_product import count_subgroups
+
+MAX_NODES = 10000
+
+
+@lru_cache(maxsize=4096)
+def factorization(n):
+    """Prime factorization of n as a tuple of (p, k) pairs (cached)."""
+    return tuple(factorize(n).items())
+
+
+@lru_cache(maxsize=4096)
+def divisors(n):
+    """Divisors of n in increasing order (cached)."""
+    divs = [1]
+    for p, k in factorization(n):
+        divs = [d * p ** e for d in divs for e in range(k + 1)]
+    return tuple(sorted(divs))
+
+
+def _valuation(m, q):
+    e = 0
+    while m % q == 0:
+        m //= q
+        e += 1
+    return e
+
+
+# -------------------------
+# Z(n): one subgroup per divisor
+# -------------------------
+
+def zn_subgroups(n):
+    """Subgroups of Z(n) in increasing order: dicts with order, index and generator n/order."""
+    for d in divisors(n):
+        yield {"order": d, "index": n // d, "generator": n // d % n}
+
+
+def zn_lattice(n):
+    """Subgroup lattice of Z(n): nodes from zn_subgroups, edges <n/d> -> <n/(dp)> of index p."""
+    nodes = list(zn_subgroups(n))
+    position = {node["order"]: i for i, node in enumerate(nodes)}
+    edges = [(position[d], position[d * p], p)
+             for d in position for p, _ in factorization(n) if n % (d * p) == 0]
+    return {"group": "Z({0})".format(n), "nodes": nodes, "edges": sorted(edges)}
+
+
+# -------------------------
+# U(n): CRT decomposition
+# -------------------------
+
+def _lift(x, pk, n):
+    """The unit that is x mod pk and 1 mod n/pk."""
+    m = n // pk
+    return (1 + (x - 1) * m * inverse(m, pk)) % n
+
+
+def cyclic_factors(n):
+    """
+    List of (generator, order) pairs with U(n) the direct product of the <generator>.
+    One factor per odd prime power of n, and up to two (-1 and 5) for 2^k.
+    """
+    factors = []
+    for p, k in factorization(n):
+        pk = p ** k
+        if p == 2:
+            if k >= 2:
+                factors.append((_lift(pk - 1, pk, n), 2))
+            if k >= 3:
+                factors.append((_lift(5, pk, n), 2 ** (k - 2)))
+        else:
+            factors.append((_lift(primitive_root(pk), pk, n), pk // p * (p - 1)))
+    return factors
+
+
+def _primary_parts(n):
+    """[(q, exponents, generators)]: the q-part of U(n) as Z(q^e1) x ... with a generator per factor."""
+    factors = cyclic_factors(n)
+    primes = sorted({q for _, m in factors for q, _ in factorization(m)})
+    parts = []
+    for q in primes:
+        exponents, generators = [], []
+        for g, m in factors:
+            e = _valuation(m, q)
+            if e:
+                exponents.append(e)
+                generators.append(pow(g, m // q ** e, n))
+        parts.append((q, exponents, generators))
+    return parts
+
+
+def _in_lattice(v, rows):
+    """Whether v is an integer combination of the echelon rows (row j has its pivot in column j)."""
+    v = list(v)
+    for j, row in enumerate(rows):
+        if v[j] % row[j]:
+            return False
+        t = v[j] // row[j]
+        if t:
+            for i in range(j, len(v)):
+                v[i] -= t * row[i]
+    return True
+
+
+def _hnf_lattices(q, exponents, wanted=None):
+    """
+    Hermite normal forms (lists of rows) of the lattices between diag(q^e) and Z^r,
+    i.e. the subgroups of Z(q^e1) x ... x Z(q^er); wanted fixes log_q of the order.
+    """
+    r = len(exponents)
+
+    def build(k, rows, size):
+        # rows holds rows k+1 .. r-1; size is log_q of the subgroup order so far
+        if k < 0:
+            if wanted is None or size == wanted:
+                yield rows
+            return
+        room = sum(exponents[:k])
+        for a in range(exponents[k] + 1):
+            grown = size + exponents[k] - a
+            if wanted is not None and not grown <= wanted <= grown + room:
+                continue
+            c = q ** (exponents[k] - a)
+            spans = [range(row[j]) for j, row in enumerate(rows, k + 1)]
+            for tail in _product(spans):
+                if _in_lattice([c * t for t in tail], [row[k + 1:] for row in rows]):
+                    row = [0] * k + [q ** a] + list(tail)
+                    yield from build(k - 1, [row] + rows, grown)
+
+    return build(r - 1, [], 0)
+
+
+def _product(ranges):
+    """Lazy itertools.product for ranges (each is re-iterated, nothing is materialized)."""
+    if not ranges:
+        yield ()
+        return
+    for x in ranges[0]:
+        for rest in _product(ranges[1:]):
+            yield (x,) + rest
+
+
+def _key(rows):
+    return tuple(map(tuple, rows))
+
+
+def _socle(q, rows):
+    """
+    Nonzero v, reduced modulo the lattice M of the rows, with q*v in M: the elements
+    of order q in Z^r / M. M + Zv runs over the lattices just above M (index q).
+    """
+    r = len(rows)
+
+    def walk(j, v, w):
+        # w = q * v[:j] minus the rows used so far to clear columns < j
+        if j == r:
+            if any(v):
+                yield v
+            return
+        p = rows[j][j]
+        for x in range(p):
+            t, rest = divmod(w[j] + q * x, p)
+            if not rest:
+                yield from walk(j + 1, v + [x], [w[i] + (q * x if i == j else 0) - t * rows[j][i]
+                                                 for i in range(r)])
+
+    return walk(0, [], [0] * r)
+
+
+def _hnf_add(rows, v):
+    """Hermite normal form (as in _hnf_lattices) of the lattice spanned by the rows and v."""
+    rows = [list(row) for row in rows]
+    v = list(v)
+    r = len(rows)
+    for k in range(r):
+        if v[k] == 0:
+            continue
+        a, b = rows[k][k], v[k]
+        # extended Euclid: s*a + t*b = g
+        g, s, t, g1, s1, t1 = a, 1, 0, b, 0, 1
+        while g1:
+            m = g // g1
+            g, g1, s, s1, t, t1 = g1, g - m * g1, s1, s - m * s1, t1, t - m * t1
+        if g < 0:
+            g, s, t = -g, -s, -t
+        row = rows[k]
+        rows[k] = [s * x + t * y for x, y in zip(row, v)]
+        v = [b // g * x - a // g * y for x, y in zip(row, v)]
+    for k in range(r):
+        for j in range(k + 1, r):
+            m = rows[k][j] // rows[j][j]
+            if m:
+                rows[k] = [x - m * y for x, y in zip(rows[k], rows[j])]
+    return rows
+
+
+def _elements(rows, generators, n):
+    """Nontrivial elements of U(n) given by the rows of a q-part lattice."""
+    out = []
+    for row in rows:
+        x = 1
+        for g, h in zip(generators, row):
+            x = x * pow(g, h, n) % n
+        if x != 1 % n:
+            out.append(x)
+    return out
+
+
+def _order(q, exponents, rows):
+    """Order of the subgroup: q^(sum of e_k - a_k) for pivots q^a_k."""
+    return q ** sum(e - _valuation(row[k], q) for k, (e, row) in enumerate(zip(exponents, rows)))
+
+
+def unit_subgroups(n, order=None):
+    """
+    Lazily yield every subgroup of U(n) (of the given order, if set) as a dict
+    with order, index and generators (units mod n; [] for the trivial subgroup).
+    """
+    parts = _primary_parts(n)
+    phi = 1
+    for q, exponents, _ in parts:
+        phi *= q ** sum(exponents)
+    if order is not None and phi % order:
+        return
+    wanted = [None if order is None else _valuation(order, q) for q, _, _ in parts]
+
+    def build(t, generators, size):
+        if t == len(parts):
+            yield {"order": size, "index": phi // size, "generators": sorted(generators)}
+            return
+        q, exponents, gens = parts[t]
+        for rows in _hnf_lattices(q, exponents, wanted[t]):
+            yield from build(t + 1, generators + _elements(rows, gens, n),
+                             size * _order(q, exponents, rows))
+
+    yield from build(0, [], 1)
+
+
+def unit_lattice(n, max_nodes=MAX_NODES):
+    """
+    Subgroup lattice of U(n): nodes as in unit_subgroups, sorted by order, and
+    covering edges (lower, upper, index). Covers change a single q-part by index q,
+    so they are found per prime (M + Zv for each v of order q modulo M, looked up
+    by Hermite normal form) and combined. ValueError past max_nodes subgroups.
+    """
+    parts = _primary_parts(n)
+    total = count_subgroups([m for _, m in cyclic_factors(n)])
+    if total > max_nodes:
+        raise ValueError("U({0}) has {1} subgroups (more than max_nodes={2})".format(n, total, max_nodes))
+
+    per_prime = []
+    for q, exponents, gens in parts:
+        lattices = list(_hnf_lattices(q, exponents))
+        info = [(_order(q, exponents, rows), _elements(rows, gens, n)) for rows in lattices]
+        position = {_key(rows): b for b, rows in enumerate(lattices)}
+        covers = [sorted({position[_key(_hnf_add(rows, v))] for v in _socle(q, rows)})
+                  for rows in lattices]
+        per_prime.append((info, covers))
+
+    combos = list(_product([range(len(info)) for info, _ in per_prime]))
+    nodes = []
+    for combo in combos:
+        size, generators = 1, []
+        for (info, _), a in zip(per_prime, combo):
+            size *= info[a][0]
+            generators += info[a][1]
+        nodes.append({"order": size, "generators": sorted(generators)})
+    phi = max(node["order"] for node in nodes)
+    for node in nodes:
+        node["index"] = phi // node["order"]
+
+    rank = sorted(range(len(nodes)), key=lambda i: (nodes[i]["order"], nodes[i]["generators"]))
+    where = {i: r for r, i in enumerate(rank)}
+    position = {combo: where[i] for i, combo in enumerate(combos)}
+    edges = []
+    for combo in combos:
+        for t, (q, _, _) in enumerate(parts):
+            for b in per_prime[t][1][combo[t]]:
+                upper = combo[:t] + (b,) + combo[t + 1:]
+                edges.append((position[combo], position[upper], q))
+    return {"group": "U({0})".format(n), "nodes": [nodes[i] for i in rank], "edges": sorted(edges)}
+
+
+# -------------------------
+# Export
+# -------------------------
+
+def _label(node):
+    if "generator" in node:
+        return "<{0}>".format(node["generator"])
+    return "<" + ", ".join(map(str, node["generators"])) + ">" if node["generators"] else "{1}"
+
+
+def lattice_dot(lattice):
+    """Graphviz source: one node per subgroup (bottom to top by order), edges labelled by index."""
+    lines = ['digraph "{0}" {{'.format(lattice["group"]), "    rankdir=BT;", "    node [shape=box];"]
+    for i, node in enumerate(lattice["nodes"]):
+        lines.append('    s{0} [label="{1}\\norder {2}"];'.format(i, _label(node), node["order"]))
+    for lower, upper, index in lattice["edges"]:
+        lines.append('    s{0} -> s{1} [arrowhead=none, label="{2}"];'.format(lower, upper, index))
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def lattice_json(lattice, indent=1):
+    return json.dumps({"group": lattice["group"], "nodes": lattice["nodes"],
+                       "edges": [{"lower": a, "upper": b, "index": p} for a, b, p in lattice["edges"]]},
+                      indent=indent)
+
+
+if __name__ == "__main__":
+    print(lattice_dot(zn_lattice(12)))
+    lattice = unit_lattice(21)
+    for node in lattice["nodes"]:
+        print(_label(node), "order", node["order"], "index", node["index"])
+    n = 10 ** 12 + 39
+    print(f"first subgroups of U({n}):")
+    for _, subgroup in zip(range(5), unit_subgroups(n)):
+        print(subgroup)
@@ -0,0 +1,148 @@
+"""
+U(n) OPERATION TABLES WITHOUT SAGE
+
+Pure Python + NumPy version of units_mod_n_table.py:
+  totient_range   phi(n) for a whole range from one segmented sieve
+  unit_array      U(n) as an integer array (np.gcd instead of is_unit)
+  table_chunks    the U(n) multiplication table, a block of rows at a time
+  write_table     streams an OperationTable-style layout to a file
+"""
+import sys
+from math import isqrt
+
+import numpy as np
+
+SEGMENT = 1 << 22
+
+
+def _small_primes(limit):
+    """Primes <= limit (plain Eratosthenes, limit is only sqrt of the range)."""
+    if limit < 2:
+        return np.zeros(0, dtype=np.int64)
+    flags = np.ones(limit + 1, dtype=bool)
+    flags[:2] = False
+    for p in range(2, isqrt(limit) + 1):
+        if flags[p]:
+            flags[p * p::p] = False
+    return np.nonzero(flags)[0]
+
+
+def _totient_segment(lo, hi, primes):
+    phi = np.arange(lo, hi, dtype=np.int64)
+    rest = phi.copy()
+    for p in primes:
+        p = int(p)
+        if p >= hi:
+            break
+        start = (-lo) % p
+        phi[start::p] -= phi[start::p] // p
+        pk = p
+        while pk < hi:
+            start = (-lo) % pk
+            rest[start::pk] //= p
+            pk *= p
+    # whatever is left over is a single prime factor above sqrt(hi)
+    big = rest > 1
+    phi[big] -= phi[big] // rest[big]
+    return phi
+
+
+def totient_chunks(lo, hi, segment=SEGMENT):
+    """Yield (start, phi-array) blocks covering phi(lo), ..., phi(hi - 1)."""
+    primes = _small_primes(isqrt(max(hi - 1, 0)))
+    for start in range(lo, hi, segment):
+        yield start, _totient_segment(start, min(start + segment, hi), primes)
+
+
+def totient_range(lo, hi):
+    """phi(n) for lo <= n < hi as one int64 array (phi(0) is reported as 0)."""
+    if hi <= lo:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([block for _, block in totient_chunks(lo, hi)])
+
+
+def moduli_with_phi(lo, hi, limit):
+    """Moduli n < limit with lo < phi(n) < hi (the srange/euler_phi scan)."""
+    found = []
+    for start, phi in totient_chunks(1, limit):
+        idx = np.nonzero((phi > lo) & (phi < hi))[0]
+        found.extend(zip((idx + start).tolist(), phi[idx].tolist()))
+    return found
+
+
+def unit_array(n):
+    """Elements of U(n) in increasing order."""
+    a = np.arange(n, dtype=np.int64)
+    return a[np.gcd(a, n) == 1]
+
+
+def table_chunks(n, rows=1024, units=None):
+    """
+    Yield (first_row, block) where block[i, j] = units[first_row + i] * units[j] mod n.
+    Each block is one outer product, so memory stays at rows * phi(n).
+    """
+    if units is None:
+        units = unit_array(n)
+    for start in range(0, len(units), rows):
+        yield start, np.multiply.outer(units[start:start + rows], units) % n
+
+
+def multiplication_table(n):
+    """Full U(n) multiplication table as a phi(n) x phi(n) array of residues."""
+    units = unit_array(n)
+    return np.multiply.outer(units, units) % n
+
+
+def index_table(n):
+    """Cayley table as indices into unit_array(n) instead of residues."""
+    units = unit_array(n)
+    return np.searchsorted(units, np.multiply.outer(units, units) % n)
+
+
+def letter_names(count):
+    """Labels a, b, ..., z, aa, ab, ... as OperationTable uses for names="letters"."""
+    names = []
+    for i in range(count):
+        name = ""
+        i += 1
+        while i:
+            i, r = divmod(i - 1, 26)
+            name = chr(ord("a") + r) + name
+        names.append(name)
+    return names
+
+
+def write_operation_table(labels, index_rows, fp=sys.stdout):
+    """
+    Write an OperationTable-style layout. index_rows yields one list of
+    label indices per row, so the table never has to be held as text.
+    """
+    width = max(len(s) for s in labels)
+    fp.write("*" + " " * width + " " + " ".join(s.rjust(width) for s in labels) + "\n")
+    fp.write(" " * width + "+" + "-" * ((width + 1) * len(labels)) + "\n")
+    for label, row in zip(labels, index_rows):
+        fp.write(label.rjust(width) + "| " + " ".join(labels[j].rjust(width) for j in row) + "\n")
+
+
+def write_table(n, fp=sys.stdout, names="letters", rows=1024):
+    """
+    Stream the U(n) table in the layout of Sage's OperationTable.
+    names="letters" labels the units a, b, c, ...; names="elements" uses the residues.
+    """
+    units = unit_array(n)
+    labels = letter_names(len(units)) if names == "letters" else [str(u) for u in units.tolist()]
+    lookup = np.full(n, -1, dtype=np.int64)
+    lookup[units] = np.arange(len(units))
+    index_rows = (row for _, block in table_chunks(n, rows, units) for row in lookup[block].tolist())
+    write_operation_table(labels, index_rows, fp)
+
+
+if __name__ == "__main__":
+    for n, phi in moduli_with_phi(4, 10, 50):
+        print(n, phi)
+
+    n = 18
+    # with letters
+    write_table(n)
+    # with Numbers
+    write_table(n, names="elements")
@@ -0,0 +1,254 @@
+"""
+BATCH WORKSHEET GENERATOR
+
+Generates many problem instances of one type and renders them to LaTeX,
+spread over a process pool, e.g.
+
+    python batch_worksheets.py laws --count 100000 --seed 7 --out build/laws
+    python batch_worksheets.py units --count 500 --param n=5:40
+    python batch_worksheets.py --spec term.json --out build/term
+
+A spec is {"type", "count", "seed", "params", "shard_size"}; a spec file
+holds one spec or a list of them. Parameter ranges are [lo, hi] inclusive.
+
+Instance i is drawn from its own Random("<seed>:<type>:<i>"), and shard j
+(instances j*shard_size ...) is written by one worker to
+<out>/<type>-<j>.tex (<k>-<type>-<j>.tex for the k-th of several specs),
+so the output is identical whatever the number of
+workers. A manifest.json lists the shards of every spec.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+for _folder in ("discrete-math", "abstract-algebra", "trigonometry"):
+    sys.path.insert(0, os.path.join(HERE, _folder))
+
+from venn_diagram_problems import venn_partition, region_order
+from verify_set_properties import write_latex_all
+from euler_relationships import get_relationship_latex, get_inclusion_exclusion_latex
+from unit_group import unit_elements
+from element_order import cyclic_subgroup
+from reduced_fractions import INFINITY
+from coterminal_radians import BOUNDS, coterminal_fractions
+
+SHARD_SIZE = 1000
+
+
+# -------------------------
+# Problem types: make(rng, params) -> instance, render(instance, fp)
+# -------------------------
+
+def _tex_set(values):
+    """LaTeX set of ints in increasing order."""
+    return "\\{" + ", ".join(map(str, sorted(values))) + "\\}"
+
+
+def _pick(rng, params, name):
+    value = params[name]
+    if isinstance(value, (list, tuple)):
+        return rng.randint(value[0], value[1])
+    return value
+
+
+def _random_sets(rng, params, names):
+    size = _pick(rng, params, "universe")
+    U = list(range(1, size + 1))
+    return U, {name: sorted(rng.sample(U, min(size, _pick(rng, params, "set_size")))) for name in names}
+
+
+def make_venn(rng, params):
+    U, sets = _random_sets(rng, params, ["A", "B", "C"])
+    return {"U": U, "sets": sets}
+
+
+def _tex_region(r, names):
+    """Region r (bit i <=> inside set i) with the set expression in math mode."""
+    inside = [name for i, name in enumerate(names) if r >> i & 1]
+    if not inside:
+        return "Outside ${0}$".format(" \\cup ".join(names))
+    if len(inside) == len(names):
+        return "${0}$".format(" \\cap ".join(names))
+    if len(inside) == 1:
+        return "Only ${0}$".format(inside[0])
+    return "${0}$ only".format(" \\cap ".join(inside))
+
+
+def render_venn(instance, fp):
+    sets = {name: set(s) for name, s in instance["sets"].items()}
+    names = list(sets)
+    fp.write("Let $U = " + _tex_set(instance["U"]) + "$ and "
+             + ", ".join("${0} = {1}$".format(name, _tex_set(s)) for name, s in sets.items())
+             + ". List the elements of every region of the Venn diagram.\n\n")
+    fp.write("\\begin{itemize}\n")
+    regions = venn_partition(sets, set(instance["U"]))
+    for r, region in zip(region_order(len(names)), regions.values()):
+        fp.write("    \\item {0}: ${1}$\n".format(_tex_region(r, names), _tex_set(region)))
+    fp.write("\\end{itemize}\n")
+
+
+def make_laws(rng, params):
+    return make_venn(rng, params)
+
+
+def render_laws(instance, fp):
+    sets = instance["sets"]
+    write_latex_all(fp, set(instance["U"]), set(sets["A"]), set(sets["B"]), set(sets["C"]))
+    fp.write("\n")
+
+
+def make_euler(rng, params):
+    k = _pick(rng, params, "sets")
+    U, sets = _random_sets(rng, params, [chr(ord("A") + i) for i in range(k)])
+    return {"U": U, "sets": sets}
+
+
+def render_euler(instance, fp):
+    sets = {name: set(s) for name, s in instance["sets"].items()}
+    fp.write(get_relationship_latex(sets) + "\n\n")
+    fp.write(get_inclusion_exclusion_latex(sets) + "\n")
+
+
+def make_units(rng, params):
+    return {"n": _pick(rng, params, "n")}
+
+
+def render_units(instance, fp):
+    n = instance["n"]
+    fp.write("List the cyclic subgroup generated by every element of $U({0})$.\n\n".format(n))
+    fp.write("\\begin{itemize}\n")
+    for a in unit_elements(n):
+        fp.write("    \\item $\\langle {0} \\rangle = {1}$\n".format(a, _tex_set(cyclic_subgroup(a, n))))
+    fp.write("\\end{itemize}\n")
+
+
+def make_coterminal(rng, params):
+    hi = INFINITY if params["hi"] is None else params["hi"]
+    bounds = {name: params[name] for name in BOUNDS}
+    (a, b), = coterminal_fractions(params["lo"], hi, count=1, seed=rng.getrandbits(64), **bounds)
+    return {"a": a, "b": b}
+
+
+def _tex_angle(a, b):
+    return "\\frac{{{0}\\pi}}{{{1}}}".format("" if a == 1 else a, b)
+
+
+def render_coterminal(instance, fp):
+    a, b = instance["a"], instance["b"]
+    fp.write("Find the angle in $[0, 2\\pi)$ coterminal with ${0}$: ${1}$\n".format(
+        _tex_angle(a, b), _tex_angle(a % (2 * b), b)))
+
+
+PROBLEMS = {
+    "venn": (make_venn, render_venn, {"universe": [8, 15], "set_size": [2, 6]}),
+    "laws": (make_laws, render_laws, {"universe": [8, 15], "set_size": [2, 6]}),
+    "euler": (make_euler, render_euler, {"universe": [8, 15], "set_size": [1, 6], "sets": [2, 4]}),
+    "units": (make_units, render_units, {"n": [5, 30]}),
+    "coterminal": (make_coterminal, render_coterminal, dict(BOUNDS, lo=2, hi=None)),
+}
+
+
+# -------------------------
+# Sharding and the pool
+# -------------------------
+
+def _spec(spec):
+    """Fill in defaults; raises ValueError on an unknown type."""
+    if spec.get("type") not in PROBLEMS:
+        raise ValueError("unknown problem type: {0!r} (choose from {1})".format(
+            spec.get("type"), ", ".join(sorted(PROBLEMS))))
+    params = dict(PROBLEMS[spec["type"]][2])
+    params.update(spec.get("params", {}))
+    return {"type": spec["type"], "count": int(spec.get("count", 1)), "seed": spec.get("seed", 0),
+            "shard_size": int(spec.get("shard_size", SHARD_SIZE)), "params": params,
+            "name": spec.get("name", spec["type"])}
+
+
+def instance(spec, i):
+    """Instance i of a spec (a plain dict), independent of everything else."""
+    make = PROBLEMS[spec["type"]][0]
+    return make(random.Random("{0}:{1}:{2}".format(spec["seed"], spec["type"], i)), spec["params"])
+
+
+def write_shard(spec, shard, out):
+    """Generate and render one shard straight to its file; returns (path, instances)."""
+    render = PROBLEMS[spec["type"]][1]
+    start = shard * spec["shard_size"]
+    stop = min(start + spec["shard_size"], spec["count"])
+    path = os.path.join(out, "{0}-{1:05d}.tex".format(spec["name"], shard))
+    with open(path, "w", encoding="utf-8") as fp:
+        for i in range(start, stop):
+            fp.write("% --- {0} {1} ---\n".format(spec["type"], i + 1))
+            render(instance(spec, i), fp)
+            fp.write("\n")
+    return path, stop - start
+
+
+def generate(specs, out, workers=None):
+    """Write every shard of every spec under out; returns the manifest dict."""
+    specs = [_spec(spec) for spec in specs]
+    if len(specs) > 1:
+        for k, spec in enumerate(specs):
+            spec["name"] = "{0:02d}-{1}".format(k, spec["name"])
+    os.makedirs(out, exist_ok=True)
+    jobs = [(spec, shard) for spec in specs
+            for shard in range((spec["count"] + spec["shard_size"] - 1) // spec["shard_size"])]
+    if workers == 1 or not jobs:
+        done = [write_shard(spec, shard, out) for spec, shard in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            done = list(pool.map(write_shard, *zip(*[(spec, shard, out) for spec, shard in jobs])))
+    manifest = {"specs": specs, "shards": [{"path": os.path.relpath(path, out), "instances": n}
+                                           for path, n in done]}
+    with open(os.path.join(out, "manifest.json"), "w") as fp:
+        json.dump(manifest, fp, indent=1)
+    return manifest
+
+
+def _parse_param(text):
+    name, _, value = text.partition("=")
+    if ":" in value:
+        lo, hi = value.split(":")
+        return name, [int(lo), int(hi)]
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate LaTeX worksheets in parallel.")
+    parser.add_argument("type", nargs="?", help="problem type: " + ", ".join(sorted(PROBLEMS)))
+    parser.add_argument("--spec", help="JSON file with one spec or a list of specs")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--seed", default=0)
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=LO:HI",
+                        help="parameter value or inclusive range (repeatable)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="worksheets")
+    args = parser.parse_args(argv)
+
+    if args.spec:
+        with open(args.spec) as fp:
+            specs = json.load(fp)
+        specs = specs if isinstance(specs, list) else [specs]
+    elif args.type:
+        specs = [{"type": args.type, "count": args.count, "seed": args.seed,
+                  "shard_size": args.shard_size, "params": dict(map(_parse_param, args.param))}]
+    else:
+        parser.error("give a problem type or --spec")
+    try:
+        manifest = generate(specs, args.out, args.workers)
+    except ValueError as err:
+        parser.error(str(err))
+    total = sum(shard["instances"] for shard in manifest["shards"])
+    print("wrote {0} instances in {1} shards to {2}".format(total, len(manifest["shards"]), args.out))
+
+
+if __name__ == "__main__":
+    main()
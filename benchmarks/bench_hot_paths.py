@@ -0,0 +1,270 @@
+"""
+SCALING BENCHMARKS FOR THE HOT PATHS
+
+Drives the set, modular-arithmetic and truth-table code over growing
+universe sizes, moduli and variable counts, and records for every
+(benchmark, size) the wall time (best and median of --repeat runs) and,
+from one separate tracemalloc run so it does not skew the timings:
+  peak_bytes        peak traced memory during the call
+  net_blocks        memory blocks allocated minus blocks freed by the call
+                    (what is still held afterwards; tracemalloc has no
+                    total allocation count)
+  net_bytes         the same in bytes
+
+    python benchmarks/bench_hot_paths.py                    # run, append to history.json
+    python benchmarks/bench_hot_paths.py --save-baseline    # ... and make this run the baseline
+    python benchmarks/bench_hot_paths.py --only venn,laws --quick
+
+Every run is appended to a JSON history (history.json and baseline.json
+are local files, ignored by git). When a baseline file exists,
+each result is compared with it and flagged when its best time or peak
+memory is more than --tolerance (default 25%) worse (times under 1 ms are
+not flagged); the exit status is 1 if anything regressed.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _folder in ("discrete-math", "abstract-algebra", "trigonometry"):
+    sys.path.insert(0, os.path.join(ROOT, _folder))
+
+from venn_diagram_problems import venn_regions
+from verify_set_properties import (demorgan_union, demorgan_intersection,
+                                   distributive_union_over_intersection,
+                                   distributive_intersection_over_union, latex_all)
+from euler_relationships import analyze_euler_relationships
+from unit_group import unit_elements
+import cyclic_modn
+from element_order import cyclic_subgroup
+from truth_tables import compile_formula
+from bdd import BDD
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(HERE, "history.json")
+BASELINE = os.path.join(HERE, "baseline.json")
+TOLERANCE = 0.25
+MIN_TIME = 0.001      # best times below this are too noisy to flag
+
+
+# -------------------------
+# Workloads: setup(size) -> zero-argument callable
+# -------------------------
+
+def _sets(size, k=3, seed=0):
+    rng = random.Random(seed)
+    U = set(range(size))
+    return U, [set(rng.sample(range(size), size // 2)) for _ in range(k)]
+
+
+def bench_venn(size):
+    U, (A, B, C) = _sets(size)
+    return lambda: venn_regions(A, B, C, U)
+
+
+def bench_laws(size):
+    U, (A, B, C) = _sets(size)
+
+    def run():
+        demorgan_union(U, A, B)
+        demorgan_intersection(U, A, B)
+        distributive_union_over_intersection(A, B, C)
+        distributive_intersection_over_union(A, B, C)
+    return run
+
+
+def bench_latex(size):
+    U, (A, B, C) = _sets(size)
+    return lambda: latex_all(U, A, B, C)
+
+
+def bench_euler(size):
+    U, (A, B, C) = _sets(size)
+
+    def run():
+        with open(os.devnull, "w") as sink, redirect_stdout(sink):
+            analyze_euler_relationships(U, A, B, C)
+    return run
+
+
+def bench_inverses(n):
+    # through cyclic_modn's names, so the benchmark follows whatever it uses
+    return lambda: [cyclic_modn.inverse(a, n) for a in cyclic_modn.unit_elements(n)]
+
+
+def bench_subgroups(n):
+    return lambda: [cyclic_subgroup(a, n) for a in unit_elements(n)]
+
+
+def bench_unit_powers(n):
+    """cyclic_modn's U(n) section: the inverse and power loop of every unit."""
+    return lambda: cyclic_modn.unit_powers(n)
+
+
+def _formula(n):
+    """The atomic_statements formula, widened to n variables (n even)."""
+    names = ["X{0}".format(i) for i in range(n)]
+    return " or ".join("({0} and not {1})".format(a, b) for a, b in zip(names[::2], names[1::2]))
+
+
+def bench_truth_table(n):
+    return lambda: compile_formula(_formula(n)).count_true()
+
+
+def bench_bdd(n):
+    def run():
+        bdd = BDD()
+        bdd.sat_count(bdd.build(_formula(n)))
+    return run
+
+
+BENCHMARKS = {
+    "venn": (bench_venn, [1000, 10000, 100000], [1000, 10000]),
+    "laws": (bench_laws, [1000, 10000, 100000], [1000, 10000]),
+    "latex": (bench_latex, [100, 1000, 10000], [100, 1000]),
+    "euler": (bench_euler, [1000, 10000, 100000], [1000, 10000]),
+    "inverses": (bench_inverses, [1009, 10007, 100003], [1009, 10007]),
+    "subgroups": (bench_subgroups, [101, 1009, 2003], [101, 1009]),
+    "unit_powers": (bench_unit_powers, [25, 50, 100], [25, 50]),
+    "truth_table": (bench_truth_table, [8, 16, 22], [8, 16]),
+    "bdd": (bench_bdd, [8, 32, 128], [8, 32]),
+}
+
+
+# -------------------------
+# Measuring
+# -------------------------
+
+def measure(fn, repeat):
+    """Best/median wall time over repeat calls, then one traced call for memory."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    return {"best": min(times), "median": statistics.median(times), "peak_bytes": peak,
+            "net_blocks": sum(stat.count_diff for stat in diff),
+            "net_bytes": sum(stat.size_diff for stat in diff)}
+
+
+def run_benchmarks(names, repeat, quick=False, log=print):
+    results = {}
+    for name in names:
+        setup, sizes, quick_sizes = BENCHMARKS[name]
+        results[name] = {}
+        for size in quick_sizes if quick else sizes:
+            stats = measure(setup(size), repeat)
+            results[name][str(size)] = stats
+            log("{0:<12} {1:>8}  best {2:9.4f}s  median {3:9.4f}s  peak {4:10.1f} KiB".format(
+                name, size, stats["best"], stats["median"], stats["peak_bytes"] / 1024))
+    return results
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record(results):
+    return {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit(), "python": platform.python_version(),
+            "machine": platform.platform(), "results": results}
+
+
+# -------------------------
+# History and baseline
+# -------------------------
+
+def _load(path, default):
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return default
+
+
+def _save(path, data):
+    with open(path, "w") as fp:
+        json.dump(data, fp, indent=1)
+
+
+def append_history(path, run):
+    history = _load(path, [])
+    history.append(run)
+    _save(path, history)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """List of regressions: dicts with benchmark, size, metric, baseline, current, ratio."""
+    regressions = []
+    for name, sizes in results.items():
+        for size, stats in sizes.items():
+            old = baseline.get("results", {}).get(name, {}).get(size)
+            if old is None:
+                continue
+            for metric in ("best", "peak_bytes"):
+                if metric == "best" and stats[metric] < MIN_TIME:
+                    continue
+                if old[metric] and stats[metric] > old[metric] * (1 + tolerance):
+                    regressions.append({"benchmark": name, "size": size, "metric": metric,
+                                        "baseline": old[metric], "current": stats[metric],
+                                        "ratio": round(stats[metric] / old[metric], 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths and check for regressions.")
+    parser.add_argument("--only", help="comma-separated benchmarks: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="smaller sizes only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmark(s): " + ", ".join(unknown))
+
+    run = record(run_benchmarks(names, args.repeat, args.quick))
+    append_history(args.history, run)
+
+    status = 0
+    baseline = _load(args.baseline, None)
+    if baseline is not None:
+        regressions = compare(run["results"], baseline, args.tolerance)
+        for r in regressions:
+            print("REGRESSION {benchmark} [{size}] {metric}: {baseline:.6g} -> {current:.6g} (x{ratio})".format(**r))
+        if not regressions:
+            print("no regressions against baseline ({0})".format(baseline.get("commit") or baseline["timestamp"]))
+        status = 1 if regressions else 0
+    if args.save_baseline:
+        _save(args.baseline, run)
+        print("saved baseline to", args.baseline)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
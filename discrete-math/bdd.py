@@ -0,0 +1,412 @@
+# -------------------------
+# Reduced ordered binary decision diagrams
+# -------------------------
+# Equivalence, tautology and satisfiability for formulas over dozens of
+# variables, where a truth table (truth_tables.py) would have 2^n rows.
+# Formulas use the same Python boolean syntax as truth_tables.py.
+#
+# Nodes are ints: 0 is False, 1 is True, every other id is a node
+# (level, lo, hi) stored once in the unique table, so two formulas are
+# equivalent exactly when they build to the same id.
+#
+#     bdd = BDD()
+#     f = bdd.build("(P <= Q) and (Q <= R)")
+#     g = bdd.build("not P or R")
+#     bdd.implies(f, g), bdd.sat_count(f), bdd.witness(f)
+
+import ast
+from collections import OrderedDict
+
+from truth_tables import _first_seen, _to_ir
+
+FALSE, TRUE = 0, 1
+TERMINAL = 1 << 30          # level of the two terminals: below every variable
+CACHE_SIZE = 1 << 16
+
+_OPS = {
+    "and": lambda a, b: a & b,
+    "or": lambda a, b: a | b,
+    "xor": lambda a, b: a ^ b,
+}
+
+
+class BDD:
+    """A BDD manager: variable order, unique table and a bounded apply cache."""
+
+    def __init__(self, order=(), cache_size=CACHE_SIZE):
+        self.order = []
+        self.level = {}
+        self.var_of = [TERMINAL, TERMINAL]      # node -> level
+        self.lo = [FALSE, TRUE]
+        self.hi = [FALSE, TRUE]
+        self.unique = {}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self.reorder_hooks = []
+        for name in order:
+            self.add_var(name)
+
+    def __len__(self):
+        """Number of nodes, terminals included."""
+        return len(self.lo)
+
+    def add_var(self, name):
+        """Append a variable at the bottom of the order (no-op if known)."""
+        if name not in self.level:
+            self.level[name] = len(self.order)
+            self.order.append(name)
+        return self.var(name)
+
+    def mk(self, level, lo, hi):
+        """The unique node for (level, lo, hi), applying the reduction rule."""
+        if lo == hi:
+            return lo
+        key = (level, lo, hi)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.lo)
+            self.var_of.append(level)
+            self.lo.append(lo)
+            self.hi.append(hi)
+            self.unique[key] = node
+        return node
+
+    def var(self, name):
+        if name not in self.level:
+            return self.add_var(name)
+        return self.mk(self.level[name], FALSE, TRUE)
+
+    # -------------------------
+    # Apply
+    # -------------------------
+
+    def apply(self, op, u, v):
+        """u op v for op in "and", "or", "xor", memoized in the bounded computed cache."""
+        if op == "and":
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif op == "or":
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        elif op == "xor":
+            if u == v:
+                return FALSE
+            if u == FALSE:
+                return v
+            if v == FALSE:
+                return u
+        if u <= TRUE and v <= TRUE:
+            return _OPS[op](u, v)
+        if u > v:                                   # all three ops commute
+            u, v = v, u
+        key = (op, u, v)
+        cache = self.cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+        self.misses += 1
+        lu, lv = self.var_of[u], self.var_of[v]
+        level = min(lu, lv)
+        u0, u1 = (self.lo[u], self.hi[u]) if lu == level else (u, u)
+        v0, v1 = (self.lo[v], self.hi[v]) if lv == level else (v, v)
+        out = self.mk(level, self.apply(op, u0, v0), self.apply(op, u1, v1))
+        cache[key] = out
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return out
+
+    def neg(self, u):
+        return self.apply("xor", u, TRUE)
+
+    def conj(self, u, v):
+        return self.apply("and", u, v)
+
+    def disj(self, u, v):
+        return self.apply("or", u, v)
+
+    def xor(self, u, v):
+        return self.apply("xor", u, v)
+
+    def iff(self, u, v):
+        return self.neg(self.apply("xor", u, v))
+
+    def implication(self, u, v):
+        return self.apply("or", self.neg(u), v)
+
+    def restrict(self, u, name, value):
+        """u with the variable fixed to value."""
+        level = self.level[name]
+        memo = {}
+
+        def walk(node):
+            if self.var_of[node] > level:
+                return node
+            if node in memo:
+                return memo[node]
+            if self.var_of[node] == level:
+                out = self.hi[node] if value else self.lo[node]
+            else:
+                out = self.mk(self.var_of[node], walk(self.lo[node]), walk(self.hi[node]))
+            memo[node] = out
+            return out
+
+        return walk(u)
+
+    # -------------------------
+    # Formulas
+    # -------------------------
+
+    def build(self, text):
+        """Node for a formula string; new variables join the order in order of appearance."""
+        tree = ast.parse(text.strip(), mode="eval")
+        for name in _first_seen(tree):
+            self.add_var(name)
+        return self._build(_to_ir(tree))
+
+    def _build(self, ir):
+        kind = ir[0]
+        if kind == "var":
+            return self.var(ir[1])
+        if kind == "const":
+            return TRUE if ir[1] else FALSE
+        args = [self._build(a) for a in ir[1:]]
+        if kind == "not":
+            return self.neg(args[0])
+        if kind == "implies":
+            return self.implication(*args)
+        if kind == "iff":
+            return self.iff(*args)
+        out = args[0]
+        for arg in args[1:]:
+            out = self.apply(kind, out, arg)
+        return out
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def evaluate(self, u, assignment):
+        """Value of u under {name: bool}; follows one path."""
+        while u > TRUE:
+            u = self.hi[u] if assignment[self.order[self.var_of[u]]] else self.lo[u]
+        return u == TRUE
+
+    def equivalent(self, u, v):
+        return u == v
+
+    def implies(self, u, v):
+        """True when every assignment satisfying u satisfies v."""
+        return self.conj(u, self.neg(v)) == FALSE
+
+    def is_tautology(self, u):
+        return u == TRUE
+
+    def is_satisfiable(self, u):
+        return u != FALSE
+
+    def support(self, u):
+        """Names of the variables u depends on, in order."""
+        levels, seen, stack = set(), set(), [u]
+        while stack:
+            node = stack.pop()
+            if node <= TRUE or node in seen:
+                continue
+            seen.add(node)
+            levels.add(self.var_of[node])
+            stack.extend((self.lo[node], self.hi[node]))
+        return [self.order[level] for level in sorted(levels)]
+
+    def node_count(self, u):
+        """Nodes reachable from u, terminals included."""
+        seen, stack = set(), [u]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                if node > TRUE:
+                    stack.extend((self.lo[node], self.hi[node]))
+        return len(seen)
+
+    def sat_count(self, u, variables=None):
+        """
+        Number of satisfying assignments over `variables` (default: every
+        variable the manager knows), which must include the support of u.
+        """
+        n = len(self.order)
+        if variables is not None:
+            variables = set(variables)
+            known = len(variables & set(self.order))
+            return self.sat_count(u) >> (n - known) << (len(variables) - known)
+        memo = {FALSE: 0, TRUE: 1}
+
+        def depth(node):
+            return min(self.var_of[node], n)
+
+        def count(node):
+            if node in memo:
+                return memo[node]
+            lo, hi = self.lo[node], self.hi[node]
+            d = depth(node)
+            out = (count(lo) << (depth(lo) - d - 1)) + (count(hi) << (depth(hi) - d - 1))
+            memo[node] = out
+            return out
+
+        return count(u) << depth(u)
+
+    def witness(self, u):
+        """One satisfying assignment {name: bool} (variables off the path are False), or None."""
+        if u == FALSE:
+            return None
+        out = {name: False for name in self.order}
+        while u > TRUE:
+            name = self.order[self.var_of[u]]
+            if self.hi[u] != FALSE:
+                out[name] = True
+                u = self.hi[u]
+            else:
+                u = self.lo[u]
+        return out
+
+    def models(self, u):
+        """Every satisfying assignment over all variables, lexicographically with True first."""
+        n = len(self.order)
+
+        def walk(node, level, partial):
+            if node == FALSE:
+                return
+            if level == n:
+                yield dict(partial)
+                return
+            name = self.order[level]
+            if self.var_of[node] == level:
+                branches = ((True, self.hi[node]), (False, self.lo[node]))
+            else:
+                branches = ((True, node), (False, node))
+            for value, child in branches:
+                partial[name] = value
+                yield from walk(child, level + 1, partial)
+            del partial[name]
+
+        yield from walk(u, 0, {})
+
+    # -------------------------
+    # Variable reordering
+    # -------------------------
+
+    def reorder(self, order, roots):
+        """
+        Rebuild the diagrams of roots under a new variable order (a permutation
+        of self.order). Returns the new root ids; all other node ids are dropped,
+        so this doubles as garbage collection.
+        """
+        if sorted(order) != sorted(self.order):
+            raise ValueError("new order must be a permutation of the current variables")
+        old_order, old_var, old_lo, old_hi = self.order, self.var_of, self.lo, self.hi
+        hooks = self.reorder_hooks
+        self.__init__(order, self.cache_size)
+        self.reorder_hooks = hooks
+        memo = {FALSE: FALSE, TRUE: TRUE}
+
+        def walk(node):
+            if node in memo:
+                return memo[node]
+            x = self.var(old_order[old_var[node]])
+            lo, hi = walk(old_lo[node]), walk(old_hi[node])
+            out = self.disj(self.conj(x, hi), self.conj(self.neg(x), lo))
+            memo[node] = out
+            return out
+
+        return [walk(root) for root in roots]
+
+    def maybe_reorder(self, roots):
+        """
+        Ask each reorder hook for a new order; hooks are callables
+        hook(bdd, roots) returning an order or None. The first order that
+        shrinks the diagrams is kept. Returns the (possibly new) root ids.
+        """
+        size = sum(self.node_count(r) for r in roots)
+        for hook in self.reorder_hooks:
+            order = hook(self, roots)
+            if order is None or list(order) == self.order:
+                continue
+            trial = BDD(self.order, self.cache_size)
+            trial_roots = _copy_into(self, trial, roots)
+            new_roots = trial.reorder(list(order), trial_roots)
+            if sum(trial.node_count(r) for r in new_roots) < size:
+                trial.reorder_hooks = self.reorder_hooks
+                self.__dict__.update(trial.__dict__)
+                return new_roots
+        return list(roots)
+
+
+def _copy_into(src, dst, roots):
+    memo = {FALSE: FALSE, TRUE: TRUE}
+
+    def walk(node):
+        if node not in memo:
+            memo[node] = dst.mk(src.var_of[node], walk(src.lo[node]), walk(src.hi[node]))
+        return memo[node]
+
+    return [walk(root) for root in roots]
+
+
+def order_by_support(bdd, roots):
+    """Example reorder hook: variables that appear in more roots go first."""
+    counts = {name: 0 for name in bdd.order}
+    for root in roots:
+        for name in bdd.support(root):
+            counts[name] += 1
+    return sorted(bdd.order, key=lambda name: -counts[name])
+
+
+# -------------------------
+# One-shot helpers
+# -------------------------
+
+def equivalent(lhs, rhs):
+    """True when two formula strings agree on every assignment."""
+    bdd = BDD()
+    return bdd.build(lhs) == bdd.build(rhs)
+
+
+def is_tautology(text):
+    return BDD().build(text) == TRUE
+
+
+def is_satisfiable(text):
+    return BDD().build(text) != FALSE
+
+
+def sat_count(text):
+    bdd = BDD()
+    return bdd.sat_count(bdd.build(text))
+
+
+def witness(text):
+    bdd = BDD()
+    return bdd.witness(bdd.build(text))
+
+
+if __name__ == "__main__":
+    print(equivalent("(P and not Q) or (not R and S)",
+                     "not ((not P or Q) and (R or not S))"))                # True
+    print(is_tautology("(P <= Q) == ((not Q) <= (not P))"))                  # True
+    print(witness("(P and not Q) or (not R and S)"))
+
+    # 40 variables: far past truth tables
+    n = 40
+    chain = " and ".join("(X{0} <= X{1})".format(i, i + 1) for i in range(n - 1))
+    bdd = BDD()
+    f = bdd.build(chain)
+    print(bdd.sat_count(f), "of", 2 ** n, "assignments satisfy the implication chain")
+    print(bdd.implies(f, bdd.build("X0 <= X{0}".format(n - 1))))           # True
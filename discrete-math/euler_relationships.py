@@ -1,72 +1,98 @@
+try:
+    from instrument import instrumented     # opt-in profiling (SETS_INSTRUMENT=1)
+except ImportError:                         # CodeSkulptor3 has no instrument module
+    def instrumented(fn):
+        return fn
+
 def analyze_euler_relationships(U, A, B, C):
-    sets = {'A': A, 'B': B, 'C': C}
-    names = list(sets.keys())
+    analyze_set_relationships(U, {'A': A, 'B': B, 'C': C})
+
+@instrumented
+def analyze_set_relationships(U, sets, index=None):
+    """Printed relationship report for any number of named sets, read off the index."""
+    if index is None:
+        index = build_relationship_index(sets)
+    names = index["names"]
     
     print("--- Euler Diagram Relationship Analysis ---")
     
     # 1. Check for Universal Set Integrity
-    for name, s in sets.items():
-        if not s.issubset(U):
+    outside = 0
+    for x, sig in index["signature"].items():
+        if x not in U:
+            outside |= sig
+    for i, name in enumerate(names):
+        if outside >> i & 1:
             print(f"Warning: Set {name} contains elements not in Universal set U!")
 
     # 2. Pairwise Comparisons
     for i in range(len(names)):
         for j in range(i + 1, len(names)):
             name1, name2 = names[i], names[j]
-            s1, s2 = sets[name1], sets[name2]
+            rel = index["relations"][i][j]
             
             print(f"\nRelationship between {name1} and {name2}:")
             
-            if s1 == s2:
+            if rel == EQUAL:
                 print(f"  - {name1} and {name2} are EQUAL.")
-            elif s1.issubset(s2):
+            elif rel == SUBSET:
                 print(f"  - {name1} is a PROPER SUBSET of {name2}.")
-            elif s2.issubset(s1):
+            elif rel == SUPERSET:
                 print(f"  - {name2} is a PROPER SUBSET of {name1}.")
-            elif s1.isdisjoint(s2):
+            elif rel == DISJOINT:
                 print(f"  - {name1} and {name2} are DISJOINT (no common elements).")
             else:
-                intersection = s1.intersection(s2)
+                intersection = common_elements(index, [name1, name2])
                 print(f"  - {name1} and {name2} OVERLAP (Intersection: {intersection}).")
 
-    # 3. Triple Intersection
-    triple_int = A.intersection(B).intersection(C)
-    if triple_int:
-        print(f"\nTriple Intersection (A ∩ B ∩ C): {triple_int}")
+    # 3. Intersection of all the sets
+    common = common_elements(index, names)
+    label = "Triple" if len(names) == 3 else "Common"
+    if common:
+        print(f"\n{label} Intersection ({' ∩ '.join(names)}): {common}")
     else:
-        print("\nThere is NO common intersection between all three sets.")
+        everything = "all three sets" if len(names) == 3 else f"all {len(names)} sets"
+        print(f"\nThere is NO common intersection between {everything}.")
 
 def get_latex_summary(U, A, B, C):
     """Generates a LaTeX bulleted list of set relationships."""
-    sets = {'A': A, 'B': B, 'C': C}
-    names = ['A', 'B', 'C']
+    return get_relationship_latex({'A': A, 'B': B, 'C': C})
+
+@instrumented
+def get_relationship_latex(sets, index=None):
+    """LaTeX bulleted list of the relationships between any number of named sets."""
+    if index is None:
+        index = build_relationship_index(sets)
+    names = index["names"]
     lines = [r"\begin{itemize}"]
 
     # 1. Pairwise Comparisons
     for i in range(len(names)):
         for j in range(i + 1, len(names)):
             n1, n2 = names[i], names[j]
-            s1, s2 = sets[n1], sets[n2]
+            kind = index["relations"][i][j]
             
-            if s1 == s2:
+            if kind == EQUAL:
                 rel = f"is equal to ${n2}$"
-            elif s1.issubset(s2):
+            elif kind == SUBSET:
                 rel = f"is a proper subset of ${n2}$ ($ {n1} \\subset {n2} $)"
-            elif s2.issubset(s1):
+            elif kind == SUPERSET:
                 rel = f"is a superset of ${n2}$ ($ {n1} \\supset {n2} $)"
-            elif s1.isdisjoint(s2):
+            elif kind == DISJOINT:
                 rel = f"is disjoint from ${n2}$ ($ {n1} \\cap {n2} = \\emptyset $)"
             else:
                 rel = f"overlaps with ${n2}$ ($ {n1} \\cap {n2} \\neq \\emptyset $)"
             
             lines.append(f"    \\item Set ${n1}$ {rel}.")
 
-    # 2. Triple Intersection
-    triple_int = A.intersection(B).intersection(C)
-    if not triple_int:
-        lines.append(f"    \\item The triple intersection is empty ($ A \\cap B \\cap C = \\emptyset $).")
+    # 2. Intersection of all the sets
+    cap = " \\cap ".join(names)
+    label = "triple" if len(names) == 3 else "common"
+    size = common_size(index, names)
+    if not size:
+        lines.append(f"    \\item The {label} intersection is empty ($ {cap} = \\emptyset $).")
     else:
-        lines.append(f"    \\item The triple intersection $ A \\cap B \\cap C $ contains {len(triple_int)} element(s).")
+        lines.append(f"    \\item The {label} intersection $ {cap} $ contains {size} element(s).")
 
     lines.append(r"\end{itemize}")
     return "\n".join(lines)
@@ -76,25 +102,257 @@ def get_union_cardinality_latex(name1, name2, s1, s2):
     Calculates union cardinality and returns the step-by-step 
     LaTeX derivation using the Inclusion-Exclusion Principle.
     """
-    card_s1 = len(s1)
-    card_s2 = len(s2)
-    intersection = s1.intersection(s2)
-    card_int = len(intersection)
-    card_union = len(s1.union(s2))
     print()
-    
+    return get_inclusion_exclusion_latex({name1: s1, name2: s2})
+
+def _signatures(sets):
+    """Inverted index {element: bitmask of the sets containing it}."""
+    signature = {}
+    for i, s in enumerate(sets.values()):
+        bit = 1 << i
+        for x in s:
+            signature[x] = signature.get(x, 0) | bit
+    return signature
+
+@instrumented
+def membership_histogram(sets, signature=None):
+    """
+    One pass over the sets: count how many elements have each membership
+    signature (bit i set <=> the element is in the i-th set).
+    """
+    if signature is None:
+        signature = _signatures(sets)
+    hist = {}
+    for sig in signature.values():
+        hist[sig] = hist.get(sig, 0) + 1
+    return hist
+
+@instrumented
+def intersection_cardinalities(sets):
+    """
+    List indexed by bitmask S: entry S is |intersection of the sets in S|
+    (entry 0 is the size of the union). A superset-sum pass over the
+    signature histogram gives all 2^k values without building any intersection.
+    """
+    k = len(sets)
+    counts = [0] * (1 << k)
+    for sig, c in membership_histogram(sets).items():
+        counts[sig] += c
+    for i in range(k):
+        bit = 1 << i
+        for mask in range(1 << k):
+            if not mask & bit:
+                counts[mask] += counts[mask | bit]
+    return counts
+
+def _ie_levels(k):
+    """Nonempty subsets of range(k) as bitmasks, grouped by size, in lexicographic order."""
+    levels = [[] for _ in range(k + 1)]
+    for mask in range(1, 1 << k):
+        levels[bin(mask).count("1")].append(mask)
+    for level in levels:
+        level.sort(key=lambda m: [i for i in range(k) if m >> i & 1])
+    return levels
+
+@instrumented
+def get_inclusion_exclusion_latex(sets, max_terms=10):
+    """
+    Step-by-step LaTeX derivation of |S1 ∪ ... ∪ Sk| by Inclusion-Exclusion
+    for a dict {name: set}. Levels with more than max_terms intersections are
+    written as one sum instead of term by term.
+    """
+    names = list(sets)
+    k = len(names)
+    counts = intersection_cardinalities(sets)
+    levels = _ie_levels(k)
+    union = " \\cup ".join(names)
+
+    def term(mask):
+        return " \\cap ".join(names[i] for i in range(k) if mask >> i & 1)
+
+    formula, substituted, simplified = [], [], []
+    total = 0
+    for j in range(1, k + 1):
+        sign = "+" if j % 2 == 1 else "-"
+        level = levels[j]
+        level_sum = sum(counts[m] for m in level)
+        total += level_sum if j % 2 == 1 else -level_sum
+        if len(level) <= max_terms:
+            symbols = ["|" + term(m) + "|" for m in level]
+            values = [str(counts[m]) for m in level]
+        else:
+            symbols = ["\\sum_{|S|=" + str(j) + "} |\\bigcap S|"]
+            values = [str(level_sum)]
+        for i, (sym, val) in enumerate(zip(symbols, values)):
+            lead = "" if j == 1 and i == 0 else " " + sign + " "
+            formula.append(lead + sym)
+            substituted.append(lead + val)
+        simplified.append(("" if j == 1 else " " + sign + " ") + str(level_sum))
+
     latex_steps = [
         r"\textbf{Step-by-Step Union Calculation:}",
         r"\begin{enumerate}",
-        f"    \\item Apply the Inclusion-Exclusion Principle: $|{name1} \\cup {name2}| = |{name1}| + |{name2}| - |{name1} \\cap {name2}|$",
-        f"    \\item Substitute the cardinalities: $|{name1} \\cup {name2}| = {card_s1} + {card_s2} - {card_int}$",
-        f"    \\item Simplify: $|{name1} \\cup {name2}| = {card_s1 + card_s2} - {card_int}$",
-        f"    \\item Result: $|{name1} \\cup {name2}| = {card_union}$",
+        f"    \\item Apply the Inclusion-Exclusion Principle: $|{union}| = {''.join(formula)}$",
+        f"    \\item Substitute the cardinalities: $|{union}| = {''.join(substituted)}$",
+        f"    \\item Simplify: $|{union}| = {''.join(simplified)}$",
+        f"    \\item Result: $|{union}| = {total}$",
         r"\end{enumerate}"
     ]
     
     return "\n".join(latex_steps)
 
+# -------------------------
+# Relationship index
+# -------------------------
+# Every pairwise relationship follows from three numbers: |Si|, |Sj| and
+# |Si ∩ Sj|. All of them come from one pass over the membership signature
+# histogram (an element in m of the sets adds to m^2 counters), so no set
+# operation is ever run between two sets. Deciding by cardinality also
+# means equal sets are always EQUAL, never a proper subset.
+
+EQUAL, SUBSET, SUPERSET, DISJOINT, OVERLAP = "equal", "subset", "superset", "disjoint", "overlap"
+
+def _members(mask):
+    out = []
+    i = 0
+    while mask:
+        if mask & 1:
+            out.append(i)
+        mask >>= 1
+        i += 1
+    return out
+
+def _relation(inter, sizes, i, j):
+    common = inter[i][j]
+    if common == sizes[i] == sizes[j]:
+        return EQUAL
+    if common == sizes[i]:
+        return SUBSET
+    if common == sizes[j]:
+        return SUPERSET
+    if common == 0:
+        return DISJOINT
+    return OVERLAP
+
+@instrumented
+def build_relationship_index(sets):
+    """
+    Index over a dict {name: set}:
+      sizes[i], intersections[i][j] = |Si ∩ Sj|,
+      relations[i][j] in EQUAL / SUBSET (Si ⊂ Sj) / SUPERSET / DISJOINT / OVERLAP,
+      classes: lists of names of equal sets, edges: Hasse diagram of proper
+      containment between classes as (lower, upper) class indices.
+    """
+    names = list(sets)
+    k = len(names)
+    signature = _signatures(sets)
+    hist = membership_histogram(sets, signature)
+
+    inter = [[0] * k for _ in range(k)]
+    for sig, c in hist.items():
+        members = _members(sig)
+        for a in members:
+            row = inter[a]
+            for b in members:
+                row[b] += c
+    return index_from_counts(names, signature, hist, inter)
+
+@instrumented
+def index_from_counts(names, signature, hist, inter, relations=None):
+    """
+    Finish an index from already gathered counts (inverted index, signature
+    histogram, pairwise intersection matrix), e.g. ones kept up to date
+    incrementally by venn_stream.VennStream.
+    """
+    k = len(names)
+    sizes = [inter[i][i] for i in range(k)]
+    if relations is None:
+        relations = [[_relation(inter, sizes, i, j) for j in range(k)] for i in range(k)]
+
+    # merge equal sets into classes, then take the transitive reduction
+    class_of = [None] * k
+    reps = []
+    for i in range(k):
+        if class_of[i] is None:
+            for j in range(i, k):
+                if class_of[j] is None and relations[i][j] == EQUAL:
+                    class_of[j] = len(reps)
+            reps.append(i)
+    above = [0] * len(reps)
+    for a, i in enumerate(reps):
+        for b, j in enumerate(reps):
+            if relations[i][j] == SUBSET:
+                above[a] |= 1 << b
+    edges = []
+    for a in range(len(reps)):
+        implied = 0
+        for b in _members(above[a]):
+            implied |= above[b]
+        edges.extend((a, b) for b in _members(above[a] & ~implied))
+
+    return {
+        "names": names,
+        "position": {name: i for i, name in enumerate(names)},
+        "signature": signature,
+        "histogram": hist,
+        "sizes": sizes,
+        "intersections": inter,
+        "relations": relations,
+        "class_of": class_of,
+        "classes": [[names[j] for j in range(k) if class_of[j] == a] for a in range(len(reps))],
+        "edges": edges,
+    }
+
+def relationship(index, name1, name2):
+    """EQUAL, SUBSET (name1 ⊂ name2), SUPERSET, DISJOINT or OVERLAP."""
+    pos = index["position"]
+    return index["relations"][pos[name1]][pos[name2]]
+
+def _related(index, name, kinds):
+    i = index["position"][name]
+    row = index["relations"][i]
+    return [n for j, n in enumerate(index["names"]) if j != i and row[j] in kinds]
+
+def equal_to(index, name):
+    return _related(index, name, (EQUAL,))
+
+def subsets_of(index, name, proper=True):
+    """Names of the sets contained in `name` (equal sets too when proper=False)."""
+    return _related(index, name, (SUPERSET,) if proper else (SUPERSET, EQUAL))
+
+def supersets_of(index, name, proper=True):
+    """Names of the sets containing `name` (equal sets too when proper=False)."""
+    return _related(index, name, (SUBSET,) if proper else (SUBSET, EQUAL))
+
+def disjoint_from(index, name):
+    return _related(index, name, (DISJOINT,))
+
+def overlapping(index, name):
+    return _related(index, name, (OVERLAP,))
+
+def _mask(index, names):
+    pos = index["position"]
+    mask = 0
+    for name in names:
+        mask |= 1 << pos[name]
+    return mask
+
+def common_size(index, names):
+    """|intersection of the named sets|, from the signature histogram."""
+    mask = _mask(index, names)
+    return sum(c for sig, c in index["histogram"].items() if sig & mask == mask)
+
+def common_elements(index, names):
+    """The intersection of the named sets, from the inverted index."""
+    mask = _mask(index, names)
+    return {x for x, sig in index["signature"].items() if sig & mask == mask}
+
+@instrumented
+def hasse_diagram(index):
+    """Containment covers between classes of equal sets, as (lower names, upper names)."""
+    classes = index["classes"]
+    return [(classes[a], classes[b]) for a, b in index["edges"]]
+
 def main():
     # Define your Universal set and subsets here
     U = set(range(1, 10))
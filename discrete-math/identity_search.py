@@ -0,0 +1,232 @@
+# -------------------------
+# Counterexample search for conjectured set identities
+# -------------------------
+# A candidate identity is any function candidate(U, A, B, C) that returns
+# a law-style result dict (with "holds") or a plain bool, e.g.
+#
+#     def conjecture(U, A, B, C):
+#         return demorgan_union(U, A, B)
+#
+# exhaustive_search tries every (A, B, C) over U = {1..n}; sample_search
+# draws random triples from a large U. Work is split into fixed-size
+# chunks and farmed out to a process pool. The first counterexample stops
+# every later chunk, and the reported counterexample is always the one
+# with the lowest chunk/position, so results do not depend on the number
+# of workers. Sets are universe-indexed bitsets (see set_bitset.py).
+#
+# Candidates must be picklable (defined at module level) unless workers=1.
+
+import multiprocessing
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from set_bitset import IntBitSet, Universe
+from verify_set_properties import demorgan_union, distributive_union_over_intersection
+
+CHUNK = 4096
+NO_HIT = 1 << 62
+
+_best = None        # lowest chunk index with a counterexample (shared between workers)
+_universes = {}
+
+
+class _Flag:
+    """Stand-in for multiprocessing.Value when running in-process."""
+    def __init__(self, value):
+        self.value = value
+
+
+def _init_worker(best):
+    global _best
+    _best = best
+
+
+def _universe(size):
+    if size not in _universes:
+        universe = Universe(range(1, size + 1))
+        _universes[size] = (universe, universe.full())
+    return _universes[size]
+
+
+def _holds(result):
+    return result["holds"] if isinstance(result, dict) else bool(result)
+
+
+def _triple(universe, full, a, b, c):
+    return full, IntBitSet(universe, a), IntBitSet(universe, b), IntBitSet(universe, c)
+
+
+def _check_exhaustive(candidate, size, chunk_id, start, stop):
+    """First triple index in [start, stop) that breaks the identity, or None."""
+    universe, full = _universe(size)
+    mask = (1 << size) - 1
+    for t in range(start, stop):
+        if (t - start) % 256 == 0 and _best.value < chunk_id:
+            return None
+        a, b, c = t & mask, (t >> size) & mask, t >> (2 * size)
+        if not _holds(candidate(*_triple(universe, full, a, b, c))):
+            return (a, b, c)
+    return None
+
+
+def _check_sample(candidate, size, seed, chunk_id, count):
+    """First random triple in this chunk's stream that breaks the identity, or None."""
+    universe, full = _universe(size)
+    rng = random.Random("{0}:{1}".format(seed, chunk_id))
+    for i in range(count):
+        if i % 256 == 0 and _best.value < chunk_id:
+            return None
+        a, b, c = rng.getrandbits(size), rng.getrandbits(size), rng.getrandbits(size)
+        if not _holds(candidate(*_triple(universe, full, a, b, c))):
+            return (a, b, c)
+    return None
+
+
+class SearchPool:
+    """
+    Process pool plus the shared "lowest chunk with a counterexample" flag.
+    Reuse one across many searches: with SearchPool() as pool: ...
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.best = multiprocessing.Value("q", NO_HIT)
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                            initargs=(self.best,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def _run_inline(jobs):
+    global _best
+    _best = _Flag(NO_HIT)
+    for chunk_id, (fn, args) in enumerate(jobs):
+        hit = fn(*args)
+        if hit is not None:
+            return chunk_id, hit
+    return None
+
+
+def _run(jobs, workers, pool):
+    """
+    Run (fn, args) jobs in chunk order; return (chunk_id, hit) for the lowest
+    chunk with a counterexample, or None. Later chunks are cancelled once a hit is known.
+    """
+    if pool is None:
+        if workers == 1:
+            return _run_inline(jobs)
+        with SearchPool(workers) as own:
+            return _run(jobs, workers, own)
+
+    best = pool.best
+    best.value = NO_HIT
+    window = 2 * pool.workers
+    pending = {}
+    hits = {}
+    jobs = iter(enumerate(jobs))
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < window:
+            nxt = next(jobs, None)
+            if nxt is None or nxt[0] > best.value:
+                exhausted = True
+                break
+            chunk_id, (fn, args) = nxt
+            pending[pool.executor.submit(fn, *args)] = chunk_id
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk_id = pending.pop(future)
+            hit = future.result()
+            if hit is not None:
+                hits[chunk_id] = hit
+                with best.get_lock():
+                    best.value = min(best.value, chunk_id)
+        for future, chunk_id in list(pending.items()):
+            if chunk_id > best.value and future.cancel():
+                del pending[future]
+    if not hits:
+        return None
+    chunk_id = min(hits)
+    return chunk_id, hits[chunk_id]
+
+
+def _report(candidate, size, mode, checked, found):
+    out = {"candidate": getattr(candidate, "__name__", repr(candidate)),
+           "mode": mode, "size": size, "checked": checked, "holds": found is None,
+           "counterexample": None}
+    if found is not None:
+        universe, full = _universe(size)
+        U, A, B, C = _triple(universe, full, *found[1])
+        out["counterexample"] = {"U": set(U), "A": set(A), "B": set(B), "C": set(C)}
+    return out
+
+
+def exhaustive_search(candidate, size, workers=None, pool=None, chunk=CHUNK):
+    """Check every (A, B, C) with U = {1..size}: 8**size triples."""
+    total = 1 << (3 * size)
+    jobs = [(_check_exhaustive, (candidate, size, i, start, min(start + chunk, total)))
+            for i, start in enumerate(range(0, total, chunk))]
+    found = _run(jobs, workers, pool)
+    checked = total if found is None else None
+    return _report(candidate, size, "exhaustive", checked, found)
+
+
+def sample_search(candidate, size, samples, seed=0, workers=None, pool=None, chunk=CHUNK):
+    """Check `samples` random triples over U = {1..size}; deterministic for a given seed and chunk."""
+    jobs = []
+    for i, start in enumerate(range(0, samples, chunk)):
+        jobs.append((_check_sample, (candidate, size, seed, i, min(chunk, samples - start))))
+    found = _run(jobs, workers, pool)
+    checked = samples if found is None else None
+    return _report(candidate, size, "sample", checked, found)
+
+
+def vet_identities(candidates, exhaustive_size=5, sample_size=200, samples=20000, seed=0, workers=None):
+    """
+    Bulk vetting: exhaustive over a small universe first, then random
+    sampling over a large one, for every candidate, on one shared pool.
+    """
+    results = []
+    with SearchPool(workers) as pool:
+        for candidate in candidates:
+            result = exhaustive_search(candidate, exhaustive_size, pool=pool)
+            if result["holds"]:
+                result = sample_search(candidate, sample_size, samples, seed, pool=pool)
+            results.append(result)
+    return results
+
+
+# -------------------------
+# Example conjectures
+# -------------------------
+
+def conjecture_demorgan(U, A, B, C):
+    return demorgan_union(U, A, B)
+
+
+def conjecture_distributive(U, A, B, C):
+    return distributive_union_over_intersection(A, B, C)
+
+
+def conjecture_difference_union(U, A, B, C):
+    """(A \\ B) ∪ C == A \\ (B ∪ C) -- false in general."""
+    return (A - B) | C == A - (B | C)
+
+
+if __name__ == "__main__":
+    for result in vet_identities([conjecture_demorgan, conjecture_distributive,
+                                  conjecture_difference_union]):
+        status = "HOLDS ✅" if result["holds"] else "DOES NOT HOLD ❌"
+        print("{0} ({1}, |U| = {2}): {3}".format(result["candidate"], result["mode"], result["size"], status))
+        if result["counterexample"]:
+            ce = result["counterexample"]
+            print("  counterexample: A = {0}, B = {1}, C = {2}".format(ce["A"], ce["B"], ce["C"]))
@@ -0,0 +1,138 @@
+# -------------------------
+# Opt-in instrumentation for the set scripts
+# -------------------------
+# Off unless the environment variable SETS_INSTRUMENT is set (to anything
+# but "" or "0") before the scripts are imported. When off, @instrumented
+# returns the function itself, so there is no wrapper and no overhead.
+# When on, every decorated function records
+#
+#   calls, inclusive time, self time (minus decorated callees), and the
+#   total size (len) of its set-like arguments,
+#
+# plus self time per call stack, which export as "collapsed stacks"
+# (one "outer;inner;leaf <microseconds>" line per stack), the input format
+# of flamegraph.pl, speedscope and inferno.
+#
+#     SETS_INSTRUMENT=1 SETS_INSTRUMENT_OUT=run.folded python verify_set_properties.py
+#
+# prints a summary table to stderr at exit and writes run.folded. In code:
+# summary(), print_summary(), write_collapsed(path), reset().
+
+import atexit
+import os
+import sys
+import threading
+import time
+
+ENABLED = os.environ.get("SETS_INSTRUMENT", "") not in ("", "0")
+OUTPUT = os.environ.get("SETS_INSTRUMENT_OUT")
+
+_stats = {}         # name -> [calls, inclusive ns, self ns, input size]
+_stacks = {}        # tuple of names -> self ns
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _size(args):
+    total = 0
+    for a in args:
+        if not isinstance(a, (str, bytes)):
+            try:
+                total += len(a)
+            except TypeError:
+                pass
+    return total
+
+
+def instrumented(fn):
+    """Count calls, time and input sizes of fn; the identity when instrumentation is off."""
+    if not ENABLED:
+        return fn
+    name = fn.__module__ + "." + fn.__qualname__
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        frame = [name, 0]                   # name, time spent in decorated callees
+        stack.append(frame)
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            stack.pop()
+            own = elapsed - frame[1]
+            if stack:
+                stack[-1][1] += elapsed
+            path = tuple(f[0] for f in stack) + (name,)
+            size = _size(args)
+            with _lock:
+                entry = _stats.get(name)
+                if entry is None:
+                    entry = _stats[name] = [0, 0, 0, 0]
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += own
+                entry[3] += size
+                _stacks[path] = _stacks.get(path, 0) + own
+
+    wrapper.__name__ = fn.__name__
+    wrapper.__qualname__ = fn.__qualname__
+    wrapper.__doc__ = fn.__doc__
+    wrapper.__module__ = fn.__module__
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _stacks.clear()
+
+
+def summary():
+    """Rows (name, calls, inclusive s, self s, mean input size), slowest self time first."""
+    with _lock:
+        rows = [(name, calls, total / 1e9, own / 1e9, size / calls)
+                for name, (calls, total, own, size) in _stats.items()]
+    return sorted(rows, key=lambda row: -row[3])
+
+
+def print_summary(fp=None):
+    fp = fp or sys.stderr
+    rows = summary()
+    if not rows:
+        print("(no instrumented calls)", file=fp)
+        return
+    width = max(len(row[0]) for row in rows)
+    print("{0}  {1:>8}  {2:>10}  {3:>10}  {4:>10}".format(
+        "function".ljust(width), "calls", "total s", "self s", "mean size"), file=fp)
+    for name, calls, total, own, size in rows:
+        print("{0}  {1:>8}  {2:>10.6f}  {3:>10.6f}  {4:>10.1f}".format(
+            name.ljust(width), calls, total, own, size), file=fp)
+
+
+def collapsed():
+    """Collapsed-stack lines "outer;inner;leaf microseconds", sorted by stack."""
+    with _lock:
+        items = sorted(_stacks.items())
+    return ["{0} {1}".format(";".join(path), max(1, own // 1000)) for path, own in items]
+
+
+def write_collapsed(path):
+    with open(path, "w") as fp:
+        for line in collapsed():
+            fp.write(line + "\n")
+
+
+def _report():
+    if _stats:
+        print_summary()
+        if OUTPUT:
+            write_collapsed(OUTPUT)
+
+
+if ENABLED:
+    atexit.register(_report)
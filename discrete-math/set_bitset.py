@@ -0,0 +1,334 @@
+# -------------------------
+# Universe-indexed bitsets
+# -------------------------
+# Drop-in replacement for Python sets inside a fixed universe U.
+# The element order of U is fixed once; every subset is then a bitmask,
+# so union, intersection, difference and complement are word-parallel
+# operations instead of per-element hashing.
+#
+#   backend="int"    one Python big int per subset (no dependencies)
+#   backend="numpy"  packed uint64 words (needs NumPy)
+#
+# The subsets support |, &, -, ^, ==, <=, len, iteration and `in`, so the
+# law functions in verify_set_properties.py and venn_regions in
+# venn_diagram_problems.py run on them unchanged:
+#
+#     U, A, B, C = as_bitsets(U, A, B, C)
+#     demorgan_union(U, A, B)["holds"]
+
+try:
+    import numpy as np
+except ImportError:  # the int backend still works
+    np = None
+
+
+def _ordered(elements):
+    """Sorted order when the elements allow it, else the verify_set_properties order."""
+    elements = list(elements)
+    try:
+        return sorted(elements)
+    except TypeError:
+        return sorted(elements, key=lambda x: (str(type(x)), str(x)))
+
+
+class Universe:
+    """Fixed element order for U; builds subsets as bitsets over it."""
+
+    def __init__(self, elements, backend="int"):
+        if backend == "numpy" and np is None:
+            raise ImportError("backend='numpy' needs NumPy")
+        if backend not in ("int", "numpy"):
+            raise ValueError("unknown backend: {0}".format(backend))
+        self.elements = _ordered(elements)
+        self.backend = backend
+        self.size = len(self.elements)
+        self.words = (self.size + 63) // 64
+        # sorted int64 copy of an all-int universe: subsets are looked up with
+        # searchsorted (or plain offsets for a range), and the dict is built lazily
+        self.keys = None
+        self._index = None
+        if backend == "numpy" and all(type(x) is int for x in self.elements):
+            try:
+                self.keys = np.array(self.elements, dtype=np.int64)
+            except OverflowError:
+                pass
+        if self.keys is not None:
+            if self.size > 1 and not (self.keys[1:] > self.keys[:-1]).all():
+                raise ValueError("universe elements must be distinct")
+        elif len(self.index) != self.size:
+            raise ValueError("universe elements must be distinct")
+
+    @property
+    def index(self):
+        """{element: position}."""
+        if self._index is None:
+            self._index = {x: i for i, x in enumerate(self.elements)}
+        return self._index
+
+    def __len__(self):
+        return self.size
+
+    def _positions(self, items):
+        try:
+            return [self.index[x] for x in items]
+        except KeyError as err:
+            raise ValueError("element {0!r} is not in the universe".format(err.args[0]))
+
+    def _position_array(self, items):
+        """Positions as a NumPy array: one searchsorted for int universes, else dict lookups in C."""
+        if self.keys is not None:
+            items = list(items)
+            values = np.array(items)
+            if values.ndim == 1 and values.dtype.kind == "i" and self.size:   # else use the dict
+                if self.size and self.keys[-1] - self.keys[0] == self.size - 1:
+                    positions = values - self.keys[0]
+                else:
+                    positions = np.searchsorted(self.keys, values)
+                found = (positions >= 0) & (positions < self.size)
+                found &= self.keys[np.clip(positions, 0, max(self.size - 1, 0))] == values
+                if not found.all():
+                    missing = values[np.argmin(found)]
+                    raise ValueError("element {0!r} is not in the universe".format(int(missing)))
+                return positions
+        try:
+            return np.fromiter(map(self.index.__getitem__, items), dtype=np.intp)
+        except KeyError as err:
+            raise ValueError("element {0!r} is not in the universe".format(err.args[0]))
+
+    def subset(self, items):
+        """Bitset for the given elements of U."""
+        if self.backend == "int":
+            # set bits in a bytearray and convert once; OR-ing into a growing int is O(k * n)
+            buf = bytearray(self.words * 8)
+            for i in self._positions(items):
+                buf[i >> 3] |= 1 << (i & 7)
+            return IntBitSet(self, int.from_bytes(buf, "little"))
+        flags = np.zeros(self.words * 64, dtype=bool)
+        flags[self._position_array(items)] = True
+        return PackedBitSet(self, np.packbits(flags, bitorder="little").view(np.uint64))
+
+    def full(self):
+        """U itself as a bitset."""
+        if self.backend == "int":
+            return IntBitSet(self, (1 << self.size) - 1)
+        words = np.full(self.words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if self.size % 64:
+            words[-1] = (1 << self.size % 64) - 1
+        return PackedBitSet(self, words)
+
+    def empty(self):
+        if self.backend == "int":
+            return IntBitSet(self, 0)
+        return PackedBitSet(self, np.zeros(self.words, dtype=np.uint64))
+
+
+class _BitSet:
+    """Operations shared by both backends; subclasses supply the bit twiddling."""
+
+    __slots__ = ("universe",)
+
+    def _check(self, other):
+        if not isinstance(other, _BitSet):
+            return False
+        if other.universe is not self.universe:
+            raise ValueError("bitsets from different universes")
+        return True
+
+    def __or__(self, other):
+        return self._binary(other, "or") if self._check(other) else NotImplemented
+
+    def __and__(self, other):
+        return self._binary(other, "and") if self._check(other) else NotImplemented
+
+    def __sub__(self, other):
+        return self._binary(other, "sub") if self._check(other) else NotImplemented
+
+    def __xor__(self, other):
+        return self._binary(other, "xor") if self._check(other) else NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, _BitSet):
+            return self._check(other) and self._equal(other)
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def _compare(self, other, op):
+        # bitsets compare by mask; plain sets compare as sets, like __eq__
+        if isinstance(other, _BitSet):
+            self._check(other)
+            if op == "le":
+                return not self._binary(other, "sub")
+            if op == "lt":
+                return not self._binary(other, "sub") and len(self) < len(other)
+            if op == "ge":
+                return not other._binary(self, "sub")
+            return not other._binary(self, "sub") and len(self) > len(other)
+        if isinstance(other, (set, frozenset)):
+            mine = set(self)
+            return {"le": mine <= other, "lt": mine < other,
+                    "ge": mine >= other, "gt": mine > other}[op]
+        return NotImplemented
+
+    def __le__(self, other):
+        return self._compare(other, "le")
+
+    def __lt__(self, other):
+        return self._compare(other, "lt")
+
+    def __ge__(self, other):
+        return self._compare(other, "ge")
+
+    def __gt__(self, other):
+        return self._compare(other, "gt")
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __contains__(self, x):
+        i = self.universe.index.get(x)
+        return i is not None and self._test(i)
+
+    def __iter__(self):
+        elements = self.universe.elements
+        for i in self._positions():
+            yield elements[i]
+
+    def issubset(self, other):
+        if not self._check(other):
+            return set(self).issubset(other)
+        return not self._binary(other, "sub")
+
+    def issuperset(self, other):
+        if not self._check(other):
+            return set(self).issuperset(other)
+        return not other._binary(self, "sub")
+
+    def isdisjoint(self, other):
+        if not self._check(other):
+            return set(self).isdisjoint(other)
+        return not self._binary(other, "and")
+
+    def union(self, *others):
+        out = self
+        for other in others:
+            out = out | other
+        return out
+
+    def intersection(self, *others):
+        out = self
+        for other in others:
+            out = out & other
+        return out
+
+    def difference(self, *others):
+        out = self
+        for other in others:
+            out = out - other
+        return out
+
+    def __repr__(self):
+        return "{" + ", ".join(map(repr, self)) + "}" if self else "set()"
+
+
+class IntBitSet(_BitSet):
+    """Subset of a Universe stored as one Python int (bit i <-> universe.elements[i])."""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, universe, mask):
+        self.universe = universe
+        self.mask = mask
+
+    def _binary(self, other, op):
+        a, b = self.mask, other.mask
+        if op == "or":
+            return IntBitSet(self.universe, a | b)
+        if op == "and":
+            return IntBitSet(self.universe, a & b)
+        if op == "sub":
+            return IntBitSet(self.universe, a & ~b)
+        return IntBitSet(self.universe, a ^ b)
+
+    def _equal(self, other):
+        return self.mask == other.mask
+
+    def _test(self, i):
+        return self.mask >> i & 1 == 1
+
+    def _positions(self):
+        # one pass over the binary string instead of peeling bits off a big int
+        bits = bin(self.mask)[:1:-1]
+        i = bits.find("1")
+        while i != -1:
+            yield i
+            i = bits.find("1", i + 1)
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __hash__(self):
+        return hash((id(self.universe), self.mask))
+
+
+class PackedBitSet(_BitSet):
+    """Subset of a Universe stored as packed uint64 words (NumPy backend)."""
+
+    __slots__ = ("words",)
+
+    def __init__(self, universe, words):
+        self.universe = universe
+        self.words = words
+
+    def _binary(self, other, op):
+        a, b = self.words, other.words
+        if op == "or":
+            return PackedBitSet(self.universe, a | b)
+        if op == "and":
+            return PackedBitSet(self.universe, a & b)
+        if op == "sub":
+            return PackedBitSet(self.universe, a & ~b)
+        return PackedBitSet(self.universe, a ^ b)
+
+    def _equal(self, other):
+        return bool(np.array_equal(self.words, other.words))
+
+    def _test(self, i):
+        return bool(self.words[i >> 6] >> np.uint64(i & 63) & np.uint64(1))
+
+    def _flags(self):
+        return np.unpackbits(self.words.view(np.uint8), bitorder="little")[:self.universe.size]
+
+    def _positions(self):
+        return iter(np.nonzero(self._flags())[0].tolist())
+
+    def __len__(self):
+        if hasattr(np, "bitwise_count"):
+            return int(np.bitwise_count(self.words).sum())
+        return int(self._flags().sum())
+
+    def __bool__(self):
+        return bool(self.words.any())
+
+    def __hash__(self):
+        return hash((id(self.universe), self.words.tobytes()))
+
+
+def as_bitsets(U, *subsets, backend="int"):
+    """Convert U and its subsets in one go: returns (U_bits, S1_bits, S2_bits, ...)."""
+    universe = Universe(U, backend)
+    return (universe.full(),) + tuple(universe.subset(S) for S in subsets)
+
+
+if __name__ == "__main__":
+    from verify_set_properties import test_all
+    from venn_diagram_problems import venn_regions, print_human
+
+    U, A, B, C = as_bitsets(set(range(1, 13)), {1, 2, 3, 6}, {2, 4, 6, 8}, {1, 5, 6, 9, 10})
+    test_all(U, A, B, C, ascii_only=False)
+    print()
+    print_human(venn_regions(A, B, C, U))
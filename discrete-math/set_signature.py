@@ -0,0 +1,171 @@
+# -------------------------
+# Region signatures: set identities for every universe at once
+# -------------------------
+# With k named sets a Venn diagram has 2^k regions; region r holds the
+# elements that are in set i exactly when bit i of r is 1. Any expression
+# built from the sets with union, intersection, difference and complement
+# is a union of regions, so it is fully described by a 2^k-bit signature
+# (bit r set <=> region r is inside). Two expressions are identical for
+# every universe exactly when their signatures are equal.
+#
+# Signatures are universe-indexed bitsets over the regions (set_bitset.py),
+# so the law functions in verify_set_properties.py run on them unchanged.
+
+import ast
+
+from set_bitset import IntBitSet, Universe
+from venn_diagram_problems import label_separator, region_label
+from verify_set_properties import (
+    demorgan_union, demorgan_intersection,
+    associativity_union, associativity_intersection,
+    distributive_union_over_intersection, distributive_intersection_over_union,
+    explain_human_demorgan, explain_human_assoc, explain_human_distrib,
+)
+
+_universes = {}
+
+
+def _regions(k):
+    if k not in _universes:
+        _universes[k] = Universe(range(1 << k))
+    return _universes[k]
+
+
+def signatures(names):
+    """Dict {name: signature} for each named set, plus "U" for the universe."""
+    k = len(names)
+    universe = _regions(k)
+    sigs = {"U": universe.full()}
+    for i, name in enumerate(names):
+        # bit r is set when bit i of r is: blocks of 2^i zeros then 2^i ones
+        block = ((1 << (1 << i)) - 1) << (1 << i)
+        mask = 0
+        for start in range(0, 1 << k, 1 << (i + 1)):
+            mask |= block << start
+        sigs[name] = IntBitSet(universe, mask)
+    return sigs
+
+
+def signature_bits(sig):
+    """The signature as a plain 2^k-bit integer."""
+    return sig.mask
+
+
+def signature_regions(sig, names):
+    """Region labels covered by a signature."""
+    sep = label_separator(names)
+    return [region_label(r, names, sep) for r in sig]
+
+
+# -------------------------
+# Expression compiler
+# -------------------------
+
+_SYMBOLS = {"∪": "|", "∩": "&", "\\": "-", "∖": "-", "△": "^"}
+
+_BINARY = {ast.BitOr: "__or__", ast.BitAnd: "__and__", ast.Sub: "__sub__", ast.BitXor: "__xor__"}
+
+
+def _names_in(text):
+    tree = ast.parse(_normalize(text), mode="eval")
+    return sorted({node.id for node in ast.walk(tree) if isinstance(node, ast.Name)} - {"U", "complement"})
+
+
+def _normalize(text):
+    for symbol, op in _SYMBOLS.items():
+        text = text.replace(symbol, op)
+    return text
+
+
+def compile_expression(text, names=None):
+    """
+    Signature of a set expression such as "U - (A | B)" or "A ∪ (B ∩ C)".
+    Operators: | ∪, & ∩, - \\, ^ △, ~X (complement in U), complement(U, X).
+    """
+    if names is None:
+        names = _names_in(text)
+    sigs = signatures(names)
+    tree = ast.parse(_normalize(text), mode="eval")
+
+    def walk(node):
+        if isinstance(node, ast.Expression):
+            return walk(node.body)
+        if isinstance(node, ast.Name):
+            if node.id not in sigs:
+                raise ValueError("unknown set name: {0}".format(node.id))
+            return sigs[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            return getattr(walk(node.left), _BINARY[type(node.op)])(walk(node.right))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+            return sigs["U"] - walk(node.operand)
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id == "complement" and len(node.args) == 2):
+            return walk(node.args[0]) - walk(node.args[1])
+        raise ValueError("unsupported syntax in set expression: {0}".format(ast.dump(node)))
+
+    return walk(tree)
+
+
+def equivalent(lhs, rhs, names=None):
+    """True when the two expressions name the same set in every universe."""
+    if names is None:
+        names = sorted(set(_names_in(lhs)) | set(_names_in(rhs)))
+    return compile_expression(lhs, names) == compile_expression(rhs, names)
+
+
+def prove(lhs, rhs, names=None):
+    """Law-style result dict for lhs == rhs, with lhs/rhs given as region labels."""
+    if names is None:
+        names = sorted(set(_names_in(lhs)) | set(_names_in(rhs)))
+    a, b = compile_expression(lhs, names), compile_expression(rhs, names)
+    return {"law": "{0} = {1}".format(lhs, rhs), "holds": a == b,
+            "lhs": set(signature_regions(a, names)), "rhs": set(signature_regions(b, names))}
+
+
+# -------------------------
+# Symbolic mode for test_all
+# -------------------------
+
+def _labelled(result, names):
+    out = dict(result)
+    out["lhs"] = set(signature_regions(result["lhs"], names))
+    out["rhs"] = set(signature_regions(result["rhs"], names))
+    return out
+
+
+def test_all_symbolic(names=("A", "B", "C"), ascii_only=False):
+    """
+    Same checks as verify_set_properties.test_all, run on region signatures:
+    a law printed as holding here holds for every universe and every A, B, C.
+    LHS/RHS are shown as the Venn regions they cover.
+    """
+    names = list(names)
+    sigs = signatures(names)
+    U, A, B, C = sigs["U"], sigs[names[0]], sigs[names[1]], sigs[names[2]]
+    An, Bn, Cn = names
+    print("Symbolic check over all {0} regions of {1}, {2}, {3} (every universe):\n".format(
+        1 << len(names), An, Bn, Cn))
+
+    pairs = [(A, B, An, Bn), (A, C, An, Cn), (B, C, Bn, Cn)]
+    for X, Y, Xn, Yn in pairs:
+        print(explain_human_demorgan(_labelled(demorgan_union(U, X, Y), names), Xn, Yn, ascii_only))
+        print()
+        print(explain_human_demorgan(_labelled(demorgan_intersection(U, X, Y), names), Xn, Yn, ascii_only))
+        print("\n" + "-" * 50 + "\n")
+
+    print(explain_human_assoc(_labelled(associativity_union(A, B, C), names), "∪", ascii_only))
+    print()
+    print(explain_human_assoc(_labelled(associativity_intersection(A, B, C), names), "∩", ascii_only))
+    print("\n" + "-" * 50 + "\n")
+
+    print(explain_human_distrib(_labelled(distributive_union_over_intersection(A, B, C), names), "∪", "∩", ascii_only))
+    print()
+    print(explain_human_distrib(_labelled(distributive_intersection_over_union(A, B, C), names), "∩", "∪", ascii_only))
+
+
+if __name__ == "__main__":
+    print(equivalent("U - (A | B)", "(U - A) & (U - B)"))     # True
+    print(equivalent("(A - B) | C", "A - (B | C)"))           # False
+    print(prove("A ∪ (B ∩ C)", "(A ∪ B) ∩ (A ∪ C)"))
+    print()
+    test_all_symbolic()
@@ -0,0 +1,371 @@
+# -------------------------
+# Memory-mapped sorted integer sets
+# -------------------------
+# U and its subsets stored on disk as raw native-endian int64 values in
+# strictly increasing order (8 bytes per element, no header). open_sorted
+# maps a file read-only and views it through memoryview.cast("q"), so
+# nothing is copied into Python objects until it is iterated.
+#
+# Union, intersection, difference and symmetric difference are streaming
+# merges over the two arrays, read in blocks, with the result written to a
+# new file and mapped in turn. Memory use stays at a few blocks no matter
+# how large the sets are. The results support |, &, -, ^, ==, <=, len,
+# iteration and `in`, so the law functions in verify_set_properties.py run
+# on them unchanged:
+#
+#     U, A, B, C = load_sorted("U.i64", "A.i64", "B.i64", "C.i64")
+#     demorgan_union(U, A, B)["holds"]
+#
+# region_arrays splits U into the 2^k Venn regions in one k-way merge.
+# Result files are created in `workdir` (default: the system temp dir) and
+# unlinked as soon as they are mapped, so they vanish when released.
+
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+
+from venn_diagram_problems import Regions, label_separator, region_label, region_order
+
+BLOCK = 1 << 16
+ITEMSIZE = 8
+
+workdir = None
+
+
+class SortedArray:
+    """Strictly increasing int64 values, backed by an mmap'd file (or an in-memory buffer)."""
+
+    def __init__(self, view, mm=None, path=None):
+        self.view = view
+        self._mm = mm
+        self.path = path
+
+    @classmethod
+    def from_values(cls, values):
+        """In-memory SortedArray from any iterable of ints (sorted and deduplicated here)."""
+        return cls(memoryview(array("q", sorted(set(values)))))
+
+    def close(self):
+        self.view.release()
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- sequence access ---
+
+    def __len__(self):
+        return len(self.view)
+
+    def __bool__(self):
+        return len(self.view) > 0
+
+    def blocks(self, size=BLOCK):
+        """The values as lists of at most `size` ints."""
+        view = self.view
+        for start in range(0, len(view), size):
+            yield view[start:start + size].tolist()
+
+    def __iter__(self):
+        for block in self.blocks():
+            yield from block
+
+    def __contains__(self, x):
+        view = self.view
+        i = bisect_left(view, x)
+        return i < len(view) and view[i] == x
+
+    def __repr__(self):
+        return "{" + ", ".join(map(str, self)) + "}" if self else "set()"
+
+    # --- set algebra ---
+
+    def __or__(self, other):
+        return _merge(self, _coerce(other), True, True, True)
+
+    def __and__(self, other):
+        other = _coerce(other)
+        small, big = (self, other) if len(self) <= len(other) else (other, self)
+        if len(small) * 16 < len(big):
+            return _write(_gallop(small, big))
+        return _merge(self, other, False, True, False)
+
+    def __sub__(self, other):
+        return _merge(self, _coerce(other), True, False, False)
+
+    def __xor__(self, other):
+        return _merge(self, _coerce(other), True, False, True)
+
+    __ror__, __rand__, __rxor__ = __or__, __and__, __xor__
+
+    def __rsub__(self, other):
+        return _coerce(other) - self
+
+    def __eq__(self, other):
+        if isinstance(other, SortedArray):
+            return self.view == other.view
+        if isinstance(other, (set, frozenset)):
+            return len(self) == len(other) and all(x in other for x in self)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def issubset(self, other):
+        other = _coerce(other)
+        if len(self) > len(other):
+            return False
+        for _ in _pairs(self, other, True, False, False):
+            return False
+        return True
+
+    def issuperset(self, other):
+        return _coerce(other).issubset(self)
+
+    def isdisjoint(self, other):
+        for _ in _pairs(self, _coerce(other), False, True, False):
+            return False
+        return True
+
+    __le__ = issubset
+    __ge__ = issuperset
+
+    def __lt__(self, other):
+        return len(self) < len(other) and self.issubset(other)
+
+    def __gt__(self, other):
+        return len(self) > len(other) and self.issuperset(other)
+
+    def union(self, *others):
+        out = self
+        for other in others:
+            out = out | other
+        return out
+
+    def intersection(self, *others):
+        out = self
+        for other in others:
+            out = out & other
+        return out
+
+    def difference(self, *others):
+        out = self
+        for other in others:
+            out = out - other
+        return out
+
+
+def _coerce(other):
+    if isinstance(other, SortedArray):
+        return other
+    return SortedArray.from_values(other)
+
+
+# -------------------------
+# Files
+# -------------------------
+
+def open_sorted(path, check=False):
+    """Map a sorted int64 file read-only, without copying. check=True verifies the order."""
+    size = os.path.getsize(path)
+    if size % ITEMSIZE:
+        raise ValueError("{0}: size {1} is not a multiple of {2}".format(path, size, ITEMSIZE))
+    if size == 0:
+        return SortedArray(memoryview(b"").cast("q"), path=path)
+    with open(path, "rb") as fp:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    out = SortedArray(memoryview(mm).cast("q"), mm, path)
+    if check:
+        last = None
+        for block in out.blocks():
+            if (last is not None and block[0] <= last) or any(a >= b for a, b in zip(block, block[1:])):
+                raise ValueError("{0}: values are not strictly increasing".format(path))
+            last = block[-1]
+    return out
+
+
+def load_sorted(*paths, check=False):
+    """open_sorted for several files: returns a tuple, e.g. U, A, B, C."""
+    return tuple(open_sorted(path, check) for path in paths)
+
+
+def save_sorted(path, values, presorted=False):
+    """
+    Write ints as a sorted int64 file. presorted=True streams an already
+    strictly increasing iterable straight to disk instead of sorting in memory.
+    """
+    if not presorted:
+        values = sorted(set(values))
+    buf = array("q")
+    with open(path, "wb") as fp:
+        for x in values:
+            buf.append(x)
+            if len(buf) >= BLOCK:
+                buf.tofile(fp)
+                del buf[:]
+        buf.tofile(fp)
+    return path
+
+
+def _write(values):
+    """Stream strictly increasing ints into a fresh temp file and map it."""
+    fd, path = tempfile.mkstemp(suffix=".i64", dir=workdir)
+    os.close(fd)
+    save_sorted(path, values, presorted=True)
+    out = open_sorted(path)
+    try:
+        os.unlink(path)          # the mapping keeps the data alive on POSIX
+        out.path = None
+    except OSError:
+        pass
+    return out
+
+
+# -------------------------
+# Streaming merges
+# -------------------------
+
+def _pairs(a, b, left, both, right):
+    """
+    Merge two SortedArrays, yielding the values found only in a (if left),
+    in both (if both) and only in b (if right), in increasing order.
+    """
+    ia, ib = a.blocks(), b.blocks()
+    xa, xb = next(ia, []), next(ib, [])
+    i = j = 0
+    while True:
+        if i == len(xa):
+            xa, i = next(ia, None), 0
+            if xa is None:
+                break
+        if j == len(xb):
+            xb, j = next(ib, None), 0
+            if xb is None:
+                break
+        x, y = xa[i], xb[j]
+        if x < y:
+            if left:
+                yield x
+            i += 1
+        elif y < x:
+            if right:
+                yield y
+            j += 1
+        else:
+            if both:
+                yield x
+            i += 1
+            j += 1
+    if left and xa is not None:
+        yield from xa[i:]
+        for block in ia:
+            yield from block
+    if right and xb is not None:
+        yield from xb[j:]
+        for block in ib:
+            yield from block
+
+
+def _merge(a, b, left, both, right):
+    return _write(_pairs(a, b, left, both, right))
+
+
+def _gallop(small, big):
+    """Intersection by binary search of each small value in big: O(m log n)."""
+    view = big.view
+    n = len(view)
+    lo = 0
+    for x in small:
+        lo = bisect_left(view, x, lo)
+        if lo == n:
+            return
+        if view[lo] == x:
+            yield x
+            lo += 1
+
+
+def region_arrays(sets, U):
+    """
+    venn_partition for SortedArrays: one k-way merge of U and the named sets,
+    each element written to the file of its region. Returns a Regions dict of
+    SortedArrays (elements of the sets outside U are kept in their regions).
+    """
+    names = list(sets)
+    sep = label_separator(names)
+    k = len(names)
+    streams = [_tagged(sets[name], i) for i, name in enumerate(names)]
+    streams.append(_tagged(U, k))
+    writers = {}
+    buffers = {}
+
+    def flush(sig):
+        buffers[sig].tofile(writers[sig][0])
+        del buffers[sig][:]
+
+    current, sig = None, 0
+    for x, i in heapq.merge(*streams):
+        if x != current:
+            if current is not None:
+                _emit(current, sig, writers, buffers, flush)
+            current, sig = x, 0
+        if i < k:
+            sig |= 1 << i
+    if current is not None:
+        _emit(current, sig, writers, buffers, flush)
+
+    regions = {}
+    for r in region_order(k):
+        if r in writers:
+            flush(r)
+            fp, path = writers[r]
+            fp.close()
+            regions[r] = open_sorted(path)
+            try:
+                os.unlink(path)
+                regions[r].path = None
+            except OSError:
+                pass
+        else:
+            regions[r] = SortedArray(memoryview(b"").cast("q"))
+    return Regions(names, ((region_label(r, names, sep), regions[r]) for r in region_order(k)))
+
+
+def _tagged(values, i):
+    for x in values:
+        yield x, i
+
+
+def _emit(x, sig, writers, buffers, flush):
+    if sig not in writers:
+        fd, path = tempfile.mkstemp(suffix=".i64", dir=workdir)
+        writers[sig] = (os.fdopen(fd, "wb"), path)
+        buffers[sig] = array("q")
+    buffers[sig].append(x)
+    if len(buffers[sig]) >= BLOCK:
+        flush(sig)
+
+
+if __name__ == "__main__":
+    from verify_set_properties import test_all
+    from venn_diagram_problems import print_human
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, values in (("U", range(1, 13)), ("A", {1, 2, 3, 6}),
+                             ("B", {2, 4, 6, 8}), ("C", {1, 5, 6, 9, 10})):
+            paths.append(save_sorted(os.path.join(tmp, name + ".i64"), values))
+        U, A, B, C = load_sorted(*paths, check=True)
+        test_all(U, A, B, C, ascii_only=False)
+        print()
+        print_human(region_arrays({"A": A, "B": B, "C": C}, U))
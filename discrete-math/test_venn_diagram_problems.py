@@ -0,0 +1,62 @@
+"""
+Checks that venn_partition keeps bitsets bitset-native: the regions come
+back as bitsets of the same backend, hold the same elements as the hash-set
+regions, and cost mask operations rather than a pass over every element.
+
+    python -m pytest -q discrete-math     # or: python test_venn_diagram_problems.py
+"""
+import random
+import time
+
+from set_bitset import as_bitsets, np
+from venn_diagram_problems import venn_partition, venn_regions
+
+BACKENDS = ["int"] + (["numpy"] if np is not None else [])
+
+
+def _sets(size, k, seed=0):
+    rng = random.Random(seed)
+    U = set(range(size))
+    # some set elements fall outside U, as venn_partition allows
+    return U, [set(rng.sample(range(size + 10), size // 2)) for _ in range(k)]
+
+
+def _best(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def test_bitset_regions_match_set_regions():
+    for k in (1, 3, 5):
+        U, subsets = _sets(200, k)
+        names = ["A", "B", "C", "D", "E"][:k]
+        for sparse in (False, True):
+            expected = venn_partition(dict(zip(names, subsets)), U, sparse)
+            for backend in BACKENDS:
+                bits = as_bitsets(U.union(*subsets), U, *subsets, backend=backend)[1:]
+                regions = venn_partition(dict(zip(names, bits[1:])), bits[0], sparse)
+                assert list(regions) == list(expected)
+                for label, region in regions.items():
+                    assert type(region) is type(bits[0]), label
+                    assert set(region) == expected[label], label
+
+
+def test_bitset_regions_stay_word_parallel():
+    U, (A, B, C) = _sets(200000, 3)
+    set_time = _best(lambda: venn_regions(A, B, C, U))
+    for backend in BACKENDS:
+        Ub, Ab, Bb, Cb = as_bitsets(U | A | B | C, U, A, B, C, backend=backend)[1:]
+        bit_time = _best(lambda: venn_regions(Ab, Bb, Cb, Ub))
+        # a per-element pass costs about as much as the hash sets do
+        assert bit_time * 5 < set_time, (backend, bit_time, set_time)
+
+
+if __name__ == "__main__":
+    test_bitset_regions_match_set_regions()
+    test_bitset_regions_stay_word_parallel()
+    print("ok")
@@ -0,0 +1,262 @@
+# -------------------------
+# Bit-parallel truth tables
+# -------------------------
+# A formula is written in Python boolean syntax over atomic statements:
+#
+#     "(P and not Q) or (not R and S)"
+#
+# Supported: and, or, not, True, False, ^ and != (exclusive or),
+# == (if and only if), <= (implication P -> Q), >= (Q -> P), & and |.
+#
+# compile_formula turns it into one bitwise expression over big ints in
+# which bit r is the value on row r of the truth table, so all 2^n rows are
+# evaluated by a handful of word-parallel operations (64 rows per machine
+# word) instead of one assignment at a time. Rows are in textbook order:
+# row 0 is all True and the first variable changes slowest, i.e. the order
+# of itertools.product((True, False), repeat=n).
+#
+# For large n the rows are evaluated in chunks of 2^chunk_bits: inside a
+# chunk the last chunk_bits variables follow fixed bit patterns and the
+# others are constant, so memory stays flat up to n ~ 30.
+
+import ast
+import io
+import itertools
+
+CHUNK_BITS = 16
+
+_TEX = {"and": r"\land", "or": r"\lor", "not": r"\lnot", "xor": r"\oplus",
+        "iff": r"\leftrightarrow", "implies": r"\rightarrow"}
+
+
+# -------------------------
+# Parsing
+# -------------------------
+
+def _first_seen(tree):
+    """Variable names in order of first appearance in the text."""
+    positions = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            key = (node.lineno, node.col_offset)
+            positions[node.id] = min(positions.get(node.id, key), key)
+    return sorted(positions, key=positions.get)
+
+
+def _to_ir(node):
+    """Reduce the Python AST to nested tuples: ("var", name), ("const", b), (op, args...)."""
+    if isinstance(node, ast.Expression):
+        return _to_ir(node.body)
+    if isinstance(node, ast.Name):
+        return ("var", node.id)
+    if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+        return ("const", node.value)
+    if isinstance(node, ast.BoolOp):
+        op = "and" if isinstance(node.op, ast.And) else "or"
+        return (op,) + tuple(_to_ir(v) for v in node.values)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+        return ("not", _to_ir(node.operand))
+    if isinstance(node, ast.BinOp):
+        ops = {ast.BitAnd: "and", ast.BitOr: "or", ast.BitXor: "xor"}
+        if type(node.op) in ops:
+            return (ops[type(node.op)], _to_ir(node.left), _to_ir(node.right))
+    if isinstance(node, ast.Compare):
+        ops = {ast.Eq: "iff", ast.NotEq: "xor", ast.LtE: "implies", ast.GtE: "implied"}
+        terms = [_to_ir(node.left)] + [_to_ir(c) for c in node.comparators]
+        parts = []
+        for op, a, b in zip(node.ops, terms, terms[1:]):
+            if type(op) not in ops:
+                break
+            kind = ops[type(op)]
+            parts.append(("implies", b, a) if kind == "implied" else (kind, a, b))
+        else:
+            return parts[0] if len(parts) == 1 else ("and",) + tuple(parts)
+    raise ValueError("unsupported syntax in formula: {0}".format(ast.dump(node)))
+
+
+def _bitwise(ir, index):
+    """Python source of the bitwise form; _v[i] is variable i's row mask, _F all ones."""
+    kind = ir[0]
+    if kind == "var":
+        return "_v[{0}]".format(index[ir[1]])
+    if kind == "const":
+        return "_F" if ir[1] else "0"
+    args = [_bitwise(a, index) for a in ir[1:]]
+    if kind == "and":
+        return "(" + " & ".join(args) + ")"
+    if kind == "or":
+        return "(" + " | ".join(args) + ")"
+    if kind == "not":
+        return "(_F ^ {0})".format(args[0])
+    if kind == "xor":
+        return "({0} ^ {1})".format(*args)
+    if kind == "iff":
+        return "(_F ^ {0} ^ {1})".format(*args)
+    return "((_F ^ {0}) | {1})".format(*args)          # implies
+
+
+def _latex(ir, top=True):
+    kind = ir[0]
+    if kind == "var":
+        return ir[1]
+    if kind == "const":
+        return "T" if ir[1] else "F"
+    if kind == "not":
+        return _TEX["not"] + " " + _latex(ir[1], False)
+    out = (" " + _TEX[kind] + " ").join(_latex(a, False) for a in ir[1:])
+    return out if top else "(" + out + ")"
+
+
+# -------------------------
+# Compiled formulas
+# -------------------------
+
+def _pattern(j, length):
+    """Row mask (length rows) of a variable that is True for 2^j rows, then False for 2^j, repeating."""
+    period = 2 << j
+    mask = (1 << (1 << j)) - 1
+    while period < length:
+        mask |= mask << period
+        period <<= 1
+    return mask & ((1 << length) - 1)
+
+
+class Formula:
+    """A propositional formula compiled to one bit-parallel expression."""
+
+    def __init__(self, text, variables=None):
+        self.text = text
+        tree = ast.parse(text.strip(), mode="eval")
+        self.ir = _to_ir(tree)
+        found = _first_seen(tree)
+        if variables is None:
+            variables = found
+        missing = [name for name in found if name not in variables]
+        if missing:
+            raise ValueError("formula uses unlisted variables: {0}".format(", ".join(missing)))
+        self.variables = list(variables)
+        index = {name: i for i, name in enumerate(self.variables)}
+        self.source = _bitwise(self.ir, index)
+        self._fn = eval("lambda _v, _F: " + self.source)
+
+    def __repr__(self):
+        return "Formula({0!r})".format(self.text)
+
+    @property
+    def n(self):
+        return len(self.variables)
+
+    def rows(self):
+        return 1 << self.n
+
+    def evaluate(self, assignment):
+        """Value for one assignment {name: bool}."""
+        return bool(self._fn([1 if assignment[name] else 0 for name in self.variables], 1))
+
+    def chunks(self, chunk_bits=CHUNK_BITS):
+        """
+        Yield (first_row, width, mask) over the whole table: bit r of mask is
+        the value on row first_row + r. Rows come in chunks of 2^chunk_bits.
+        """
+        n = self.n
+        c = min(chunk_bits, n)
+        width = 1 << c
+        full = (1 << width) - 1
+        low = [_pattern(n - 1 - i, width) for i in range(n - c, n)]
+        for t in range(1 << (n - c)):
+            # the first n - c variables are constant in this chunk: True while their bit of t is 0
+            high = [0 if t >> (n - c - 1 - i) & 1 else full for i in range(n - c)]
+            yield t * width, width, self._fn(high + low, full)
+
+    def truth_mask(self):
+        """The whole table as one int (bit r = value on row r); use chunks() for large n."""
+        (_, _, mask), = self.chunks(self.n)
+        return mask
+
+    def count_true(self, chunk_bits=CHUNK_BITS):
+        return sum(mask.bit_count() for _, _, mask in self.chunks(chunk_bits))
+
+    def is_tautology(self, chunk_bits=CHUNK_BITS):
+        return all(mask == (1 << width) - 1 for _, width, mask in self.chunks(chunk_bits))
+
+    def is_satisfiable(self, chunk_bits=CHUNK_BITS):
+        return any(mask for _, _, mask in self.chunks(chunk_bits))
+
+    def equivalent(self, other, chunk_bits=CHUNK_BITS):
+        """Same value on every row, over the union of both variable lists."""
+        names = self.variables + [v for v in other.variables if v not in self.variables]
+        a, b = Formula(self.text, names), Formula(other.text, names)
+        return all(x[2] == y[2] for x, y in zip(a.chunks(chunk_bits), b.chunks(chunk_bits)))
+
+    def models(self, chunk_bits=CHUNK_BITS):
+        """Row indices where the formula is True, in order."""
+        for start, _, mask in self.chunks(chunk_bits):
+            bits = bin(mask)[:1:-1]
+            r = bits.find("1")
+            while r != -1:
+                yield start + r
+                r = bits.find("1", r + 1)
+
+    def assignment(self, row):
+        """The assignment {name: bool} on a row of the table."""
+        n = self.n
+        return {name: not row >> (n - 1 - i) & 1 for i, name in enumerate(self.variables)}
+
+    def table(self, chunk_bits=CHUNK_BITS):
+        """Stream (assignment tuple, value) for every row, in table order."""
+        assignments = itertools.product((True, False), repeat=self.n)
+        for _, width, mask in self.chunks(chunk_bits):
+            bits = bin(mask)[:1:-1].ljust(width, "0")
+            for bit, row in zip(bits, itertools.islice(assignments, width)):
+                yield row, bit == "1"
+
+    def latex(self):
+        return _latex(self.ir)
+
+
+def compile_formula(text, variables=None):
+    """Parse and compile a formula string (see the module comment for the syntax)."""
+    return Formula(text, variables)
+
+
+# -------------------------
+# Writers
+# -------------------------
+
+def write_csv(formula, fp, true="T", false="F", chunk_bits=CHUNK_BITS):
+    """Stream the truth table as CSV: one column per variable, then the formula."""
+    fp.write(",".join(formula.variables + ['"' + formula.text.replace('"', '""') + '"']) + "\n")
+    for row, value in formula.table(chunk_bits):
+        fp.write(",".join(true if v else false for v in row) + "," + (true if value else false) + "\n")
+
+
+def write_latex(formula, fp, chunk_bits=CHUNK_BITS):
+    """Stream the truth table as a LaTeX tabular."""
+    cols = "c" * formula.n
+    fp.write("\\begin{tabular}{" + cols + "|c}\n")
+    header = ["$" + v + "$" for v in formula.variables] + ["$" + formula.latex() + "$"]
+    fp.write("  " + " & ".join(header) + " \\\\\n  \\hline\n")
+    for row, value in formula.table(chunk_bits):
+        cells = ["T" if v else "F" for v in row] + ["T" if value else "F"]
+        fp.write("  " + " & ".join(cells) + " \\\\\n")
+    fp.write("\\end{tabular}\n")
+
+
+def latex_truth_table(formula):
+    """write_latex into a string."""
+    out = io.StringIO()
+    write_latex(formula, out)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    import sys
+
+    f = compile_formula("(P and not Q) or (not R and S)")
+    print(f.evaluate({"P": True, "Q": False, "R": True, "S": False}))   # as in atomic_statements.py
+    print(f.count_true(), "of", f.rows(), "rows are True")
+    print(compile_formula("(P <= Q) == ((not Q) <= (not P))").is_tautology())
+    print()
+    write_csv(f, sys.stdout)
+    print()
+    print(latex_truth_table(compile_formula("P <= Q")))
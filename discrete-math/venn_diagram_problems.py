@@ -1,15 +1,144 @@
+try:
+    from instrument import instrumented     # opt-in profiling (SETS_INSTRUMENT=1)
+except ImportError:                         # CodeSkulptor3 has no instrument module
+    def instrumented(fn):
+        return fn
+
+
 def venn_regions(A, B, C, U):
     """Return dict of the 8 regions of a 3‑set Venn diagram."""
-    return {
-        "onlyA":  A - B - C,
-        "onlyB":  B - A - C,
-        "onlyC":  C - A - B,
-        "onlyAB": (A & B) - C,
-        "onlyAC": (A & C) - B,
-        "onlyBC": (B & C) - A,
-        "ABC":    A & B & C,
-        "notABC": U - (A | B | C)
-    }
+    return venn_partition({"A": A, "B": B, "C": C}, U)
+
+
+class Regions(dict):
+    """Region label -> set, remembering the set names (in order) it was built from."""
+
+    def __init__(self, names, regions):
+        dict.__init__(self, regions)
+        self.names = list(names)
+
+
+def label_separator(names):
+    """
+    Separator for region labels: "" when every name has the same length, so
+    onlyAB can only mean A and B; "_" otherwise (sets A, AB, B give onlyA_B
+    and onlyAB). ValueError for names that would still give clashing labels.
+    """
+    if len(set(names)) != len(names):
+        raise ValueError("set names must be distinct: {0}".format(list(names)))
+    sep = "" if len({len(name) for name in names}) <= 1 else "_"
+    if sep and any(sep in name for name in names):
+        raise ValueError("set names of different lengths cannot contain {0!r}: {1}".format(sep, list(names)))
+    joined = sep.join(names)
+    if len(names) > 1 and joined.startswith("only"):
+        # the all-sets label must not read as "only" + some of the names
+        parts = _names_in(joined[4:], names, sep)
+        if parts == [name for name in names if name in parts]:
+            raise ValueError("set names give clashing region labels: {0}".format(list(names)))
+    return sep
+
+
+def region_label(r, names, sep=None):
+    """Label of region r (bit i of r set <=> inside set i): onlyA, onlyAB, ABC, notABC."""
+    if sep is None:
+        sep = label_separator(names)
+    inside = [name for i, name in enumerate(names) if r >> i & 1]
+    if not inside:
+        return "not" + sep.join(names)
+    if len(inside) == len(names):
+        return sep.join(names)
+    return "only" + sep.join(inside)
+
+
+def region_order(k):
+    """Regions by number of sets inside (1, 2, ..., k), then the outside region last."""
+    inside = sorted(range(1, 1 << k),
+                    key=lambda r: (bin(r).count("1"), [i for i in range(k) if r >> i & 1]))
+    return inside + [0]
+
+
+@instrumented
+def venn_partition(sets, U, sparse=False):
+    """
+    Split U into the 2^k regions of a k-set Venn diagram.
+    sets is a dict {name: set} (order matters). Hash sets go in one pass:
+    each element's membership signature (bit i <=> element in set i) picks
+    its region bucket. Bitsets (anything with & and - that is not a set)
+    are split by mask algebra instead, so the regions stay bitsets.
+    sparse=True leaves out empty regions, for many sets over few elements.
+    """
+    names = list(sets)
+    sep = label_separator(names)
+    if _mask_sets([U] + [sets[name] for name in names]):
+        buckets = _mask_buckets([sets[name] for name in names], U, sparse)
+    else:
+        buckets = _hash_buckets([sets[name] for name in names], U)
+    order = [r for r in region_order(len(names)) if r in buckets] if sparse else region_order(len(names))
+    return Regions(names, ((region_label(r, names, sep), buckets.get(r, set())) for r in order))
+
+
+def _mask_sets(values):
+    return all(not isinstance(s, (set, frozenset)) and hasattr(s, "__and__") and hasattr(s, "__sub__")
+               for s in values)
+
+
+def _hash_buckets(sets, U):
+    signature = {}
+    for i, s in enumerate(sets):
+        bit = 1 << i
+        for x in s:
+            signature[x] = signature.get(x, 0) | bit
+    buckets = {}
+    for x, sig in signature.items():
+        buckets.setdefault(sig, set()).add(x)
+    outside = set()
+    for x in U:
+        if x not in signature:
+            outside.add(x)
+    if outside:
+        buckets[0] = outside
+    return buckets
+
+
+def _mask_buckets(sets, U, sparse):
+    """Split U and the sets by each set in turn: 2^(k+1) mask operations for k sets."""
+    whole = U
+    for s in sets:
+        whole = whole | s
+    buckets = {0: whole}
+    for i, s in enumerate(sets):
+        bit = 1 << i
+        split = {}
+        for r, part in buckets.items():
+            for key, piece in ((r | bit, part & s), (r, part - s)):
+                if piece or not sparse:
+                    split[key] = piece
+        buckets = split
+    return buckets
+
+
+def _display_label(key, names):
+    sep = label_separator(names)
+    if key == region_label(0, names, sep):
+        return "Outside " + sep.join(names) + ":"
+    if key == region_label((1 << len(names)) - 1, names, sep):
+        return " ∩ ".join(names) + ":"
+    inside = _names_in(key[4:], names, sep)
+    if len(inside) == 1:
+        return "Only " + inside[0] + ":"
+    return " ∩ ".join(inside) + " only:"
+
+
+def _names_in(joined, names, sep):
+    """Split the names part of a label: on sep, or into chunks when every name has the same length."""
+    if sep:
+        return joined.split(sep)
+    width = len(names[0])
+    return [joined[i:i + width] for i in range(0, len(joined), width)]
+
+
+def _region_names(regions):
+    return getattr(regions, "names", ["A", "B", "C"])
 
 
 def _brace(s):
@@ -17,37 +146,33 @@ def _brace(s):
     return "{" + ", ".join(map(str, sorted(s))) + "}"
 
 
+@instrumented
 def print_human(regions):
-    print("Only A:      ", _brace(regions["onlyA"]))
-    print("Only B:      ", _brace(regions["onlyB"]))
-    print("Only C:      ", _brace(regions["onlyC"]))
-    print("A ∩ B only:  ", _brace(regions["onlyAB"]))
-    print("A ∩ C only:  ", _brace(regions["onlyAC"]))
-    print("B ∩ C only:  ", _brace(regions["onlyBC"]))
-    print("A ∩ B ∩ C:   ", _brace(regions["ABC"]))
-    print("Outside ABC: ", _brace(regions["notABC"]))
+    names = _region_names(regions)
+    labels = [_display_label(key, names) for key in regions]
+    width = max((len(label) for label in labels), default=0) + 1
+    for label, key in zip(labels, regions):
+        print(label.ljust(width), _brace(regions[key]))
 
 
+@instrumented
 def print_form(regions):
-    print(f"form[labelOnlyA={_brace(regions['onlyA'])},")
-    print(f"     labelOnlyB={_brace(regions['onlyB'])},")
-    print(f"     labelOnlyC={_brace(regions['onlyC'])},")
-    print(f"     labelOnlyAB={_brace(regions['onlyAB'])},")
-    print(f"     labelOnlyAC={_brace(regions['onlyAC'])},")
-    print(f"     labelOnlyBC={_brace(regions['onlyBC'])},")
-    print(f"     labelABC={_brace(regions['ABC'])},")
-    print(f"     labelNotABC={_brace(regions['notABC'])}]")
+    keys = list(regions)
+    for i, key in enumerate(keys):
+        lead = "form[" if i == 0 else "     "
+        end = "]" if i == len(keys) - 1 else ","
+        print(f"{lead}label{key[0].upper()}{key[1:]}={_brace(regions[key])}{end}")
     
 
-U = set(range(1, 10))
-A = {2,3,4}
-B = {2,3,4,8}
-C = {1,8}
-
+if __name__ == "__main__":
+    U = set(range(1, 10))
+    A = {2,3,4}
+    B = {2,3,4,8}
+    C = {1,8}
 
-regions = venn_regions(A, B, C, U)
 
-print_human(regions)
-print()
-print_form(regions)
+    regions = venn_regions(A, B, C, U)
 
+    print_human(regions)
+    print()
+    print_form(regions)
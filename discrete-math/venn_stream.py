@@ -0,0 +1,174 @@
+# -------------------------
+# Incremental Venn / Euler state
+# -------------------------
+# Keeps a k-set Venn diagram up to date from a stream of membership events
+#
+#     (element, set name, "add" | "remove")
+#
+# without ever rebuilding the sets. Every element carries its membership
+# signature (bit i <=> element in set i), so an event moves one element
+# between two region buckets and touches the pairwise intersection counts
+# and relationship flags of the one set involved: O(k) per event.
+#
+# snapshot() returns the same Regions dict as venn_partition, so
+# print_human / print_form work on it, and relationship_index() returns an
+# index for analyze_set_relationships / get_relationship_latex:
+#
+#     stream = VennStream(["A", "B", "C"], U=range(1, 10))
+#     stream.feed(events)
+#     print_human(stream.snapshot())
+
+from euler_relationships import _members, _relation, index_from_counts
+from venn_diagram_problems import Regions, label_separator, region_label, region_order
+
+ADD, REMOVE = "add", "remove"
+
+
+class VennStream:
+    """Venn regions, region sizes and pairwise relationships for k named sets, updated per event."""
+
+    def __init__(self, names, U=()):
+        self.names = list(names)
+        self.sep = label_separator(self.names)
+        self.position = {name: i for i, name in enumerate(self.names)}
+        k = len(self.names)
+        self.signature = {}                  # element -> membership bitmask
+        self.buckets = {0: set()}            # bitmask -> elements of that region
+        for x in U:
+            self.signature[x] = 0
+            self.buckets[0].add(x)
+        self.inter = [[0] * k for _ in range(k)]
+        self.relations = [[_relation(self.inter, [0] * k, i, j) for j in range(k)] for i in range(k)]
+        self.events = 0
+
+    def __len__(self):
+        """Number of elements seen (the universe so far)."""
+        return len(self.signature)
+
+    def _move(self, x, old, new):
+        bucket = self.buckets[old]
+        bucket.discard(x)
+        if not bucket and old:
+            del self.buckets[old]
+        self.buckets.setdefault(new, set()).add(x)
+        self.signature[x] = new
+
+    def _refresh(self, i):
+        inter, rows = self.inter, self.relations
+        sizes = [inter[j][j] for j in range(len(inter))]
+        for j in range(len(inter)):
+            rows[i][j] = _relation(inter, sizes, i, j)
+            rows[j][i] = _relation(inter, sizes, j, i)
+
+    def add(self, x, name):
+        """Put x into the named set (no-op if it is already there)."""
+        i = self.position[name]
+        bit = 1 << i
+        old = self.signature.get(x)
+        if old is None:
+            old = 0
+            self.signature[x] = 0
+            self.buckets[0].add(x)
+        self.events += 1
+        if old & bit:
+            return
+        row = self.inter[i]
+        for j in _members(old):
+            row[j] += 1
+            self.inter[j][i] += 1
+        row[i] += 1
+        self._move(x, old, old | bit)
+        self._refresh(i)
+
+    def remove(self, x, name):
+        """Take x out of the named set (no-op if it is not there); x stays in the universe."""
+        i = self.position[name]
+        bit = 1 << i
+        old = self.signature.get(x, 0)
+        self.events += 1
+        if not old & bit:
+            return
+        new = old & ~bit
+        row = self.inter[i]
+        for j in _members(new):
+            row[j] -= 1
+            self.inter[j][i] -= 1
+        row[i] -= 1
+        self._move(x, old, new)
+        self._refresh(i)
+
+    def apply(self, x, name, op):
+        if op == ADD:
+            self.add(x, name)
+        elif op == REMOVE:
+            self.remove(x, name)
+        else:
+            raise ValueError("unknown event type: {0!r}".format(op))
+
+    def feed(self, events):
+        """Apply an iterable of (element, set name, "add" | "remove") events in order."""
+        for x, name, op in events:
+            self.apply(x, name, op)
+        return self
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def size(self, name):
+        i = self.position[name]
+        return self.inter[i][i]
+
+    def intersection_size(self, name1, name2):
+        return self.inter[self.position[name1]][self.position[name2]]
+
+    def relationship(self, name1, name2):
+        """EQUAL, SUBSET (name1 ⊂ name2), SUPERSET, DISJOINT or OVERLAP, as currently true."""
+        return self.relations[self.position[name1]][self.position[name2]]
+
+    def region_counts(self, sparse=False):
+        """{region label: number of elements}, in venn_partition order, without copying any set."""
+        order = region_order(len(self.names))
+        return {region_label(r, self.names, self.sep): len(self.buckets.get(r, ()))
+                for r in order if not sparse or self.buckets.get(r)}
+
+    def snapshot(self, sparse=False):
+        """Regions dict (copies of the current buckets) for print_human / print_form."""
+        order = region_order(len(self.names))
+        if sparse:
+            order = [r for r in order if self.buckets.get(r)]
+        return Regions(self.names, ((region_label(r, self.names, self.sep), set(self.buckets.get(r, ())))
+                                    for r in order))
+
+    def sets(self):
+        """The current sets, rebuilt from the region buckets: {name: set}."""
+        out = {name: set() for name in self.names}
+        for sig, bucket in self.buckets.items():
+            for i in _members(sig):
+                out[self.names[i]].update(bucket)
+        return out
+
+    def relationship_index(self):
+        """Relationship index (see euler_relationships) of the current state."""
+        signature = {x: sig for x, sig in self.signature.items() if sig}
+        hist = {sig: len(bucket) for sig, bucket in self.buckets.items() if sig}
+        return index_from_counts(self.names, signature, hist,
+                                 [row[:] for row in self.inter],
+                                 [row[:] for row in self.relations])
+
+
+if __name__ == "__main__":
+    from euler_relationships import analyze_set_relationships
+    from venn_diagram_problems import print_human
+
+    U = set(range(1, 10))
+    stream = VennStream(["A", "B", "C"], U)
+    stream.feed([(x, "A", ADD) for x in (2, 3, 4, 9)])
+    stream.feed([(x, "B", ADD) for x in (2, 3, 4, 8)])
+    stream.feed([(1, "C", ADD), (8, "C", ADD), (9, "A", REMOVE)])
+
+    print_human(stream.snapshot())
+    print()
+    print(stream.region_counts(sparse=True))
+    print()
+    analyze_set_relationships(U, stream.sets(), stream.relationship_index())
@@ -2,33 +2,68 @@
 # Helpers (CodeSkulptor3-safe)
 # -------------------------
 
+try:
+    from instrument import instrumented     # opt-in profiling (SETS_INSTRUMENT=1)
+except ImportError:                         # CodeSkulptor3 has no instrument module
+    def instrumented(fn):
+        return fn
+
+@instrumented
 def _sorted_list(s):
     """Return a consistent order for readability across types."""
-    return sorted(list(s), key=lambda x: (str(type(x)), str(x)))
+    names = {}
+
+    def key(x):
+        t = type(x)
+        if t not in names:
+            names[t] = str(t)
+        return (names[t], str(x))
+
+    return sorted(s, key=key)
 
 def _set_str(s):
     """Human-readable set like {1, 2, 3} with stable order."""
     return "{" + ", ".join(map(str, _sorted_list(s))) + "}"
 
+_LATEX_SPECIALS = str.maketrans({
+    "\\": r"\textbackslash{}",
+    "{": r"\{", "}": r"\}",
+    "#": r"\#", "$": r"\$", "%": r"\%",
+    "&": r"\&", "_": r"\_",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+})
+
+@instrumented
 def _latex_escape(text):
-    """Escape common LaTeX special characters."""
-    s = str(text)
-    repl = [
-        ("\\", r"\textbackslash{}"),
-        ("{", r"\{"), ("}", r"\}"),
-        ("#", r"\#"), ("$", r"\$"), ("%", r"\%"),
-        ("&", r"\&"), ("_", r"\_"),
-        ("~", r"\textasciitilde{}"),
-        ("^", r"\textasciicircum{}"),
-    ]
-    for a, b in repl:
-        s = s.replace(a, b)
-    return s
+    """Escape common LaTeX special characters (one pass with str.translate)."""
+    return str(text).translate(_LATEX_SPECIALS)
+
+_set_latex_cache = {}
+_SET_LATEX_CACHE_SIZE = 1024
 
+@instrumented
 def _set_latex(S):
-    """Render a Python set as a LaTeX set: \{a, b, c\}."""
-    items = [_latex_escape(x) for x in _sorted_list(S)]
-    return r"\{" + ", ".join(items) + r"\}"
+    """Render a Python set as a LaTeX set: \{a, b, c\}. Cached by content."""
+    # the output depends only on each element's (type, str), so key on those:
+    # {1, 2}, {True, 2} and {1.0, 2} are equal sets but render differently
+    key = frozenset([(type(x), str(x)) for x in S])
+    # distinct elements with the same (type, str), e.g. two nan objects, would
+    # share a key: such sets neither read nor fill the cache
+    cacheable = len(key) == len(S)
+    tex = _set_latex_cache.get(key) if cacheable else None
+    if tex is None:
+        if len({t for t, _ in key}) == 1:
+            # one type: the (type, str) order is just the order of the strings
+            strings = sorted(str(x) for x in S)
+        else:
+            strings = [str(x) for x in _sorted_list(S)]
+        tex = r"\{" + _latex_escape(", ".join(strings)) + r"\}"
+        if cacheable:
+            if len(_set_latex_cache) >= _SET_LATEX_CACHE_SIZE:
+                _set_latex_cache.clear()
+            _set_latex_cache[key] = tex
+    return tex
 
 def complement(U, X):
     """Set complement relative to U."""
@@ -39,6 +74,7 @@ def complement(U, X):
 # Laws to test
 # -------------------------
 
+@instrumented
 def demorgan_union(U, X, Y):
     """
     De Morgan #1: U \ (X ∪ Y) == (U \ X) ∩ (U \ Y)
@@ -47,6 +83,7 @@ def demorgan_union(U, X, Y):
     rhs = complement(U, X) & complement(U, Y)
     return {"law": "De Morgan (complement of union)", "lhs": lhs, "rhs": rhs, "holds": lhs == rhs, "X": X, "Y": Y}
 
+@instrumented
 def demorgan_intersection(U, X, Y):
     """
     De Morgan #2: U \ (X ∩ Y) == (U \ X) ∪ (U \ Y)
@@ -55,12 +92,14 @@ def demorgan_intersection(U, X, Y):
     rhs = complement(U, X) | complement(U, Y)
     return {"law": "De Morgan (complement of intersection)", "lhs": lhs, "rhs": rhs, "holds": lhs == rhs, "X": X, "Y": Y}
 
+@instrumented
 def associativity_union(A, B, C):
     """(A ∪ B) ∪ C == A ∪ (B ∪ C)"""
     lhs = (A | B) | C
     rhs = A | (B | C)
     return {"law": "Associativity (union)", "lhs": lhs, "rhs": rhs, "holds": lhs == rhs}
 
+@instrumented
 def associativity_intersection(A, B, C):
     """(A ∩ B) ∩ C == A ∩ (B ∩ C)"""
     lhs = (A & B) & C
@@ -69,12 +108,14 @@ def associativity_intersection(A, B, C):
 
 # --- NEW: Distributive laws ---
 
+@instrumented
 def distributive_union_over_intersection(A, B, C):
     """A ∪ (B ∩ C) = (A ∪ B) ∩ (A ∪ C)"""
     lhs = A | (B & C)
     rhs = (A | B) & (A | C)
     return {"law": "Distributive (union over intersection)", "lhs": lhs, "rhs": rhs, "holds": lhs == rhs}
 
+@instrumented
 def distributive_intersection_over_union(A, B, C):
     """A ∩ (B ∪ C) = (A ∩ B) ∪ (A ∩ C)"""
     lhs = A & (B | C)
@@ -86,6 +127,7 @@ def distributive_intersection_over_union(A, B, C):
 # Human-readable formatters
 # -------------------------
 
+@instrumented
 def explain_human_demorgan(result, Xname="X", Yname="Y", ascii_only=False):
     lhs_s = _set_str(result["lhs"])
     rhs_s = _set_str(result["rhs"])
@@ -105,6 +147,7 @@ def explain_human_demorgan(result, Xname="X", Yname="Y", ascii_only=False):
     out.append("  Result: {0}".format(status))
     return "\n".join(out)
 
+@instrumented
 def explain_human_assoc(result, op_symbol="∪", ascii_only=False):
     lhs_s = _set_str(result["lhs"])
     rhs_s = _set_str(result["rhs"])
@@ -124,6 +167,7 @@ def explain_human_assoc(result, op_symbol="∪", ascii_only=False):
     out.append("  Result: {0}".format(status))
     return "\n".join(out)
 
+@instrumented
 def explain_human_distrib(result, outer_symbol, inner_symbol, ascii_only=False):
     """Readable explanation for distributive results."""
     lhs_s = _set_str(result["lhs"])
@@ -147,116 +191,84 @@ def explain_human_distrib(result, outer_symbol, inner_symbol, ascii_only=False):
 
 
 # -------------------------
-# LaTeX formatters (concise, “a couple steps”; built by concatenation)
+# LaTeX formatters (concise, “a couple steps”; built from templates)
 # -------------------------
 
+_LATEX_BLOCK = (
+    "\\[\n"
+    "\\begin{aligned}\n"
+    "%(head)s"
+    "&= %(lhs)s \\quad\\text{and}\\quad %(rhs)s && \\text{compute both sides}\\\\\n"
+    "&\\text{so the sets are equal.}\n"
+    "\\end{aligned}\n"
+    "\\]\n")
+
+_LATEX_HEADS = {
+    "demorgan_union":
+        "U \\setminus (%(X)s \\cup %(Y)s)\n"
+        "&= (U \\setminus %(X)s) \\cap (U \\setminus %(Y)s) && \\text{by De Morgan}\\\\[2pt]\n",
+    "demorgan_intersection":
+        "U \\setminus (%(X)s \\cap %(Y)s)\n"
+        "&= (U \\setminus %(X)s) \\cup (U \\setminus %(Y)s) && \\text{by De Morgan}\\\\[2pt]\n",
+    "associativity_union":
+        "(A \\cup B) \\cup C &= A \\cup (B \\cup C) && \\text{associativity}\\\\[2pt]\n",
+    "associativity_intersection":
+        "(A \\cap B) \\cap C &= A \\cap (B \\cap C) && \\text{associativity}\\\\[2pt]\n",
+    "distrib_union_over_intersection":
+        "A \\cup (B \\cap C)\n"
+        "&= (A \\cup B) \\cap (A \\cup C) && \\text{distributive law}\\\\[2pt]\n",
+    "distrib_intersection_over_union":
+        "A \\cap (B \\cup C)\n"
+        "&= (A \\cap B) \\cup (A \\cap C) && \\text{distributive law}\\\\[2pt]\n",
+}
+
+@instrumented
+def render_latex(kind, result, Xname="X", Yname="Y"):
+    """LaTeX block for a law result already computed by one of the law functions."""
+    head = _LATEX_HEADS[kind] % {"X": _latex_escape(Xname), "Y": _latex_escape(Yname)}
+    return _LATEX_BLOCK % {"head": head, "lhs": _set_latex(result["lhs"]), "rhs": _set_latex(result["rhs"])}
+
+@instrumented
 def latex_demorgan_union(U, X, Y, Xname="X", Yname="Y"):
-    lhs = complement(U, X | Y)
-    rhs = complement(U, X) & complement(U, Y)
-    Xn = _latex_escape(Xname)
-    Yn = _latex_escape(Yname)
-    lhs_tex = _set_latex(lhs)
-    rhs_tex = _set_latex(rhs)
-    s  = ""
-    s += "\\[\n"
-    s += "\\begin{aligned}\n"
-    s += "U \\setminus (" + Xn + " \\cup " + Yn + ")\n"
-    s += "&= (U \\setminus " + Xn + ") \\cap (U \\setminus " + Yn + ") && \\text{by De Morgan}\\\\[2pt]\n"
-    s += "&= " + lhs_tex + " \\quad\\text{and}\\quad " + rhs_tex + " && \\text{compute both sides}\\\\\n"
-    s += "&\\text{so the sets are equal.}\n"
-    s += "\\end{aligned}\n"
-    s += "\\]\n"
-    return s
+    return render_latex("demorgan_union", demorgan_union(U, X, Y), Xname, Yname)
 
+@instrumented
 def latex_demorgan_intersection(U, X, Y, Xname="X", Yname="Y"):
-    lhs = complement(U, X & Y)
-    rhs = complement(U, X) | complement(U, Y)
-    Xn = _latex_escape(Xname)
-    Yn = _latex_escape(Yname)
-    lhs_tex = _set_latex(lhs)
-    rhs_tex = _set_latex(rhs)
-    s  = ""
-    s += "\\[\n"
-    s += "\\begin{aligned}\n"
-    s += "U \\setminus (" + Xn + " \\cap " + Yn + ")\n"
-    s += "&= (U \\setminus " + Xn + ") \\cup (U \\setminus " + Yn + ") && \\text{by De Morgan}\\\\[2pt]\n"
-    s += "&= " + lhs_tex + " \\quad\\text{and}\\quad " + rhs_tex + " && \\text{compute both sides}\\\\\n"
-    s += "&\\text{so the sets are equal.}\n"
-    s += "\\end{aligned}\n"
-    s += "\\]\n"
-    return s
+    return render_latex("demorgan_intersection", demorgan_intersection(U, X, Y), Xname, Yname)
 
+@instrumented
 def latex_associativity_union(A, B, C):
-    lhs = (A | B) | C
-    rhs = A | (B | C)
-    lhs_tex = _set_latex(lhs)
-    rhs_tex = _set_latex(rhs)
-    s  = ""
-    s += "\\[\n"
-    s += "\\begin{aligned}\n"
-    s += "(A \\cup B) \\cup C &= A \\cup (B \\cup C) && \\text{associativity}\\\\[2pt]\n"
-    s += "&= " + lhs_tex + " \\quad\\text{and}\\quad " + rhs_tex + " && \\text{compute both sides}\\\\\n"
-    s += "&\\text{so the sets are equal.}\n"
-    s += "\\end{aligned}\n"
-    s += "\\]\n"
-    return s
+    return render_latex("associativity_union", associativity_union(A, B, C))
 
+@instrumented
 def latex_associativity_intersection(A, B, C):
-    lhs = (A & B) & C
-    rhs = A & (B & C)
-    lhs_tex = _set_latex(lhs)
-    rhs_tex = _set_latex(rhs)
-    s  = ""
-    s += "\\[\n"
-    s += "\\begin{aligned}\n"
-    s += "(A \\cap B) \\cap C &= A \\cap (B \\cap C) && \\text{associativity}\\\\[2pt]\n"
-    s += "&= " + lhs_tex + " \\quad\\text{and}\\quad " + rhs_tex + " && \\text{compute both sides}\\\\\n"
-    s += "&\\text{so the sets are equal.}\n"
-    s += "\\end{aligned}\n"
-    s += "\\]\n"
-    return s
+    return render_latex("associativity_intersection", associativity_intersection(A, B, C))
 
 # --- NEW: LaTeX for distributive laws ---
 
+@instrumented
 def latex_distrib_union_over_intersection(A, B, C):
-    lhs = A | (B & C)
-    rhs = (A | B) & (A | C)
-    lhs_tex = _set_latex(lhs)
-    rhs_tex = _set_latex(rhs)
-    s  = ""
-    s += "\\[\n"
-    s += "\\begin{aligned}\n"
-    s += "A \\cup (B \\cap C)\n"
-    s += "&= (A \\cup B) \\cap (A \\cup C) && \\text{distributive law}\\\\[2pt]\n"
-    s += "&= " + lhs_tex + " \\quad\\text{and}\\quad " + rhs_tex + " && \\text{compute both sides}\\\\\n"
-    s += "&\\text{so the sets are equal.}\n"
-    s += "\\end{aligned}\n"
-    s += "\\]\n"
-    return s
+    return render_latex("distrib_union_over_intersection", distributive_union_over_intersection(A, B, C))
 
+@instrumented
 def latex_distrib_intersection_over_union(A, B, C):
-    lhs = A & (B | C)
-    rhs = (A & B) | (A & C)
-    lhs_tex = _set_latex(lhs)
-    rhs_tex = _set_latex(rhs)
-    s  = ""
-    s += "\\[\n"
-    s += "\\begin{aligned}\n"
-    s += "A \\cap (B \\cup C)\n"
-    s += "&= (A \\cap B) \\cup (A \\cap C) && \\text{distributive law}\\\\[2pt]\n"
-    s += "&= " + lhs_tex + " \\quad\\text{and}\\quad " + rhs_tex + " && \\text{compute both sides}\\\\\n"
-    s += "&\\text{so the sets are equal.}\n"
-    s += "\\end{aligned}\n"
-    s += "\\]\n"
-    return s
+    return render_latex("distrib_intersection_over_union", distributive_intersection_over_union(A, B, C))
 
 
 # -------------------------
 # Convenience runners (integrated)
 # -------------------------
 
-def test_all(U, A, B, C, ascii_only=False):
-    """Print human-readable checks for De Morgan (pairs), associativity, and distributive laws."""
+def test_all(U, A, B, C, ascii_only=False, mode="concrete"):
+    """
+    Print human-readable checks for De Morgan (pairs), associativity, and distributive laws.
+    mode="symbolic" checks the laws on Venn region signatures instead, which
+    proves them for every universe (see set_signature.py); U, A, B, C are then unused.
+    """
+    if mode == "symbolic":
+        from set_signature import test_all_symbolic
+        test_all_symbolic(("A", "B", "C"), ascii_only)
+        return
     # De Morgan on each pair (A,B), (A,C), (B,C)
     pairs = [(A, B, "A", "B"), (A, C, "A", "C"), (B, C, "B", "C")]
     for X, Y, Xn, Yn in pairs:
@@ -276,23 +288,58 @@ def test_all(U, A, B, C, ascii_only=False):
     print()
     print(explain_human_distrib(distributive_intersection_over_union(A, B, C), "∩", "∪", ascii_only))
 
-def latex_all(U, A, B, C):
+@instrumented
+def law_results(U, A, B, C):
+    """
+    Every law checked once, in solution-key order:
+    list of (kind, result, Xname, Yname), shared by the LaTeX writers.
+    """
+    out = []
+    for X, Y, Xn, Yn in [(A, B, "A", "B"), (A, C, "A", "C"), (B, C, "B", "C")]:
+        out.append(("demorgan_union", demorgan_union(U, X, Y), Xn, Yn))
+        out.append(("demorgan_intersection", demorgan_intersection(U, X, Y), Xn, Yn))
+    out.append(("associativity_union", associativity_union(A, B, C), "X", "Y"))
+    out.append(("associativity_intersection", associativity_intersection(A, B, C), "X", "Y"))
+    out.append(("distrib_union_over_intersection", distributive_union_over_intersection(A, B, C), "X", "Y"))
+    out.append(("distrib_intersection_over_union", distributive_intersection_over_union(A, B, C), "X", "Y"))
+    return out
+
+_LATEX_SEPARATOR = "\n\n% ---\n\n"
+
+def write_latex_all(fp, U, A, B, C, results=None):
+    """Stream the latex_all blocks to a file-like object (anything with .write)."""
+    if results is None:
+        results = law_results(U, A, B, C)
+    for i, (kind, result, Xn, Yn) in enumerate(results):
+        if i:
+            fp.write(_LATEX_SEPARATOR)
+        fp.write(render_latex(kind, result, Xn, Yn))
+
+def write_solution_key(fp, problems):
+    """
+    Stream a solution key for many problems, each an (U, A, B, C) tuple,
+    one block at a time; memory does not grow with the number of problems.
+    """
+    for i, (U, A, B, C) in enumerate(problems, 1):
+        if i > 1:
+            fp.write("\n\n")
+        fp.write("% === Problem {0} ===\n\n".format(i))
+        write_latex_all(fp, U, A, B, C)
+
+class _Collector:
+    """Minimal file-like object that keeps what is written to it."""
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+@instrumented
+def latex_all(U, A, B, C, results=None):
     """Return a single LaTeX string with concise solutions for all requested laws."""
-    pieces = []
-    # De Morgan
-    pieces.append(latex_demorgan_union(U, A, B, "A", "B"))
-    pieces.append(latex_demorgan_intersection(U, A, B, "A", "B"))
-    pieces.append(latex_demorgan_union(U, A, C, "A", "C"))
-    pieces.append(latex_demorgan_intersection(U, A, C, "A", "C"))
-    pieces.append(latex_demorgan_union(U, B, C, "B", "C"))
-    pieces.append(latex_demorgan_intersection(U, B, C, "B", "C"))
-    # Associativity
-    pieces.append(latex_associativity_union(A, B, C))
-    pieces.append(latex_associativity_intersection(A, B, C))
-    # Distributive (NEW)
-    pieces.append(latex_distrib_union_over_intersection(A, B, C))
-    pieces.append(latex_distrib_intersection_over_union(A, B, C))
-    return ("\n\n% ---\n\n").join(pieces)
+    out = _Collector()
+    write_latex_all(out, U, A, B, C, results)
+    return "".join(out.parts)
 
 
 # -------------------------
@@ -0,0 +1,240 @@
+"""
+LOCAL RENDER SERVICE
+
+A long-running HTTP server (standard library only) that imports the set,
+Euler and modular-arithmetic functions once and keeps size-bounded LRU
+caches of their results, so repeated requests skip both the interpreter
+start-up and the computation.
+
+    python render_service.py --port 8765 --cache-size 4096
+
+POST a JSON object to
+    /regions   {"U": [...], "sets": {"A": [...], ...}}     Venn regions
+    /laws      {"U": [...], "A": [...], "B": [...], "C": [...]}
+                                                          law checks + LaTeX key
+    /euler     {"sets": {"A": [...], ...}}                relationships, Hasse
+                                                          diagram, LaTeX
+    /units     {"n": 18}                                  U(n): elements, inverses,
+                                                          element orders
+GET /stats for the hit/miss counters of every cache (functools cache_info),
+and POST /stats/clear to empty them. Set elements must be JSON integers or
+strings (not floats, booleans or null), and /regions and /euler take at
+most MAX_SETS sets, since their work grows as 2^k.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+for _folder in ("discrete-math", "abstract-algebra"):
+    sys.path.insert(0, os.path.join(HERE, _folder))
+
+from venn_diagram_problems import venn_partition
+from verify_set_properties import law_results, latex_all
+from euler_relationships import (build_relationship_index, get_relationship_latex,
+                                 get_inclusion_exclusion_latex, hasse_diagram)
+from unit_group import unit_group
+from element_order import element_orders
+
+CACHE_SIZE = 1024
+MAX_MODULUS = 10 ** 6
+MAX_SETS = 16
+
+
+def _key(values):
+    """Hashable, order-independent cache key for a JSON list of set elements."""
+    if not isinstance(values, list):
+        raise ValueError("sets must be JSON lists")
+    for x in values:
+        # bool is an int subclass, and True == 1 would merge them in set()
+        if type(x) not in (int, str):
+            raise ValueError("set elements must be integers or strings, not {0}".format(json.dumps(x)))
+    return tuple(sorted(set(values), key=lambda x: (type(x).__name__, x)))
+
+
+def _named_key(sets):
+    if not isinstance(sets, dict) or not sets:
+        raise ValueError("'sets' must be a non-empty object {name: [elements]}")
+    if len(sets) > MAX_SETS:
+        raise ValueError("at most {0} sets are allowed, got {1}".format(MAX_SETS, len(sets)))
+    return tuple((str(name), _key(values)) for name, values in sets.items())
+
+
+def _listed(s):
+    return sorted(s, key=lambda x: (type(x).__name__, x))
+
+
+# -------------------------
+# Cached computations (arguments are the hashable keys above)
+# -------------------------
+
+def compute_regions(U, sets):
+    regions = venn_partition({name: set(values) for name, values in sets}, set(U))
+    return {"names": regions.names, "regions": {label: _listed(r) for label, r in regions.items()}}
+
+
+def compute_laws(U, A, B, C):
+    U, A, B, C = set(U), set(A), set(B), set(C)
+    results = law_results(U, A, B, C)
+    return {
+        "laws": [{"law": result["law"], "sets": [Xn, Yn] if kind.startswith("demorgan") else ["A", "B", "C"],
+                  "holds": result["holds"]} for kind, result, Xn, Yn in results],
+        "latex": latex_all(U, A, B, C, results),
+    }
+
+
+def compute_euler(sets):
+    sets = {name: set(values) for name, values in sets}
+    index = build_relationship_index(sets)
+    names = index["names"]
+    return {
+        "names": names,
+        "sizes": index["sizes"],
+        "relations": {a: {b: index["relations"][i][j] for j, b in enumerate(names) if j != i}
+                      for i, a in enumerate(names)},
+        "hasse": hasse_diagram(index),
+        "latex": get_relationship_latex(sets, index) + "\n\n" + get_inclusion_exclusion_latex(sets),
+    }
+
+
+def compute_units(n):
+    group = unit_group(n)
+    orders = element_orders(n)
+    return {
+        "n": n,
+        "order": group["order"],
+        "elements": list(group["elements"]),
+        "inverses": list(group["inverses"]),
+        "orders": [orders[a] for a in group["elements"]],
+    }
+
+
+class RenderService:
+    """The cached entry points; one instance is shared by every request thread."""
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.caches = {
+            "regions": lru_cache(maxsize=cache_size)(compute_regions),
+            "laws": lru_cache(maxsize=cache_size)(compute_laws),
+            "euler": lru_cache(maxsize=cache_size)(compute_euler),
+            "units": lru_cache(maxsize=cache_size)(compute_units),
+        }
+        self.requests = {}
+        self.lock = threading.Lock()          # request threads share the counters
+        self.started = time.time()
+
+    def regions(self, body):
+        return self.caches["regions"](_key(body.get("U", [])), _named_key(body.get("sets")))
+
+    def laws(self, body):
+        try:
+            return self.caches["laws"](*(_key(body[name]) for name in ("U", "A", "B", "C")))
+        except KeyError as err:
+            raise ValueError("missing set {0}".format(err.args[0]))
+
+    def euler(self, body):
+        return self.caches["euler"](_named_key(body.get("sets")))
+
+    def units(self, body):
+        n = body.get("n")
+        if not isinstance(n, int) or not 1 <= n <= MAX_MODULUS:
+            raise ValueError("'n' must be an integer in 1..{0}".format(MAX_MODULUS))
+        return self.caches["units"](n)
+
+    def stats(self):
+        with self.lock:
+            requests = dict(self.requests)
+        out = {"uptime": round(time.time() - self.started, 3), "requests": requests, "caches": {}}
+        for name, cached in self.caches.items():
+            info = cached.cache_info()
+            lookups = info.hits + info.misses
+            out["caches"][name] = {"hits": info.hits, "misses": info.misses, "maxsize": info.maxsize,
+                                   "currsize": info.currsize,
+                                   "hit_rate": round(info.hits / lookups, 4) if lookups else None}
+        return out
+
+    def clear(self):
+        for cached in self.caches.values():
+            cached.cache_clear()
+        return self.stats()
+
+    def handle(self, method, path, body):
+        """(status, payload) for one request."""
+        routes = {("POST", "/regions"): self.regions, ("POST", "/laws"): self.laws,
+                  ("POST", "/euler"): self.euler, ("POST", "/units"): self.units}
+        if (method, path) == ("GET", "/stats"):
+            return 200, self.stats()
+        if (method, path) == ("POST", "/stats/clear"):
+            return 200, self.clear()
+        route = routes.get((method, path))
+        if route is None:
+            return 404, {"error": "no route for {0} {1}".format(method, path)}
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+        try:
+            return 200, route(body)
+        except (ValueError, TypeError) as err:
+            return 400, {"error": str(err)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "RenderService/1"
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._reply(*self.server.service.handle("GET", self.path, None))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "request body is not valid JSON"})
+        if not isinstance(body, dict):
+            return self._reply(400, {"error": "request body must be a JSON object"})
+        self._reply(*self.server.service.handle("POST", self.path, body))
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, fmt, *args)
+
+
+def make_server(host="127.0.0.1", port=8765, cache_size=CACHE_SIZE, verbose=False):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.service = RenderService(cache_size)
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve set and group computations from warm caches.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="entries per LRU cache")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.cache_size, args.verbose)
+    print("serving on http://{0}:{1}".format(*server.server_address[:2]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
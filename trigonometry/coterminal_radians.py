@@ -1,18 +1,20 @@
-# generating reduced fractions where the numerator 
-# is less than twice the denominator (1 < a/b < 2)
-for _ in range(30):
-    a = randrange(5,20)
-    b = randrange(2,15)
+from reduced_fractions import INFINITY, sample_fractions
 
-    if a/b > 1 and a/b < 2 and gcd(a,b) == 1:
+COUNT = 10
+BOUNDS = {"min_num": 5, "max_num": 19, "min_den": 2, "max_den": 14}
+
+def coterminal_fractions(lo, hi, count=COUNT, seed=None, **bounds):
+    """count distinct reduced fractions a/b with lo < a/b < hi, as (a, b) pairs; bounds override BOUNDS."""
+    return list(sample_fractions(count, lo, hi, seed=seed, **{**BOUNDS, **bounds}))
+
+if __name__ == "__main__":
+    # generating reduced fractions where the numerator
+    # is less than twice the denominator (1 < a/b < 2)
+    for a, b in coterminal_fractions(1, 2):
         pass
         #print(a,b)
-        
-# generating reduced fractions where the numerator 
-# is more than twice the denominator (a/b > 2)
-for _ in range(30):
-    a = randrange(5,20)
-    b = randrange(2,15)
 
-    if a/b > 2 and a != b and gcd(a,b) == 1:
+    # generating reduced fractions where the numerator
+    # is more than twice the denominator (a/b > 2)
+    for a, b in coterminal_fractions(2, INFINITY):
         print(a,b)
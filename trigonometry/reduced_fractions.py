@@ -0,0 +1,116 @@
+# Reduced fractions p/q in an interval, with bounds on p and q,
+# enumerated by walking the Stern–Brocot tree.
+#
+# Every positive reduced fraction appears exactly once in the tree, in
+# increasing order from left to right, and numerators and denominators
+# only grow going down, so a subtree is skipped as soon as it leaves the
+# interval or the bounds. Nothing is generated and thrown away, and no
+# float division is done (all comparisons are cross-multiplications).
+#
+# sample_fractions picks exactly N distinct fractions, uniformly and
+# reproducibly for a given seed, without rejection: it counts the
+# candidates, draws N distinct ranks, and picks those out of a second walk.
+
+import math
+import random
+from fractions import Fraction
+
+INFINITY = (1, 0)
+
+
+def _pair(x):
+    """(num, den) for an int, Fraction, float, (num, den) tuple, or INFINITY (or float('inf'))."""
+    if isinstance(x, tuple):
+        return x
+    if isinstance(x, float) and (math.isinf(x) or math.isnan(x)):
+        if x > 0:
+            return INFINITY
+        raise ValueError("bound must be a finite number or +infinity, not {0!r}".format(x))
+    x = Fraction(x)
+    return x.numerator, x.denominator
+
+
+def _less(a, b):
+    """a < b for (num, den) pairs with den >= 0 (1/0 is +infinity)."""
+    return a[0] * b[1] < b[0] * a[1]
+
+
+def reduced_fractions(lo=0, hi=INFINITY, max_den=None, min_den=1, max_num=None, min_num=1,
+                      inclusive=False):
+    """
+    Yield (p, q) with gcd(p, q) == 1 and lo < p/q < hi (lo <= p/q <= hi if
+    inclusive), min_den <= q <= max_den and min_num <= p <= max_num, in
+    increasing order. The search must be finite: max_den with a finite hi,
+    max_num with lo > 0, or both.
+    """
+    lo, hi = _pair(lo), _pair(hi)
+    if not ((max_den is not None and (hi[1] != 0 or max_num is not None))
+            or (max_num is not None and lo[0] > 0)):
+        raise ValueError("unbounded search: give max_den with a finite hi, max_num with lo > 0, or both")
+    if lo[0] < 0:
+        raise ValueError("only positive fractions are enumerated (lo must be >= 0)")
+
+    def inside(p):
+        if inclusive:
+            return not _less(p, lo) and not _less(hi, p)
+        return _less(lo, p) and _less(p, hi)
+
+    def too_big(p, q):
+        return (max_den is not None and q > max_den) or (max_num is not None and p > max_num)
+
+    # in-order walk with an explicit stack of (left bound, right bound) pairs;
+    # the subtree between a/b and c/d holds exactly the fractions in (a/b, c/d)
+    stack = [((0, 1), (1, 0), False)]
+    while stack:
+        left, right, visit = stack.pop()
+        p, q = left[0] + right[0], left[1] + right[1]
+        if visit:
+            if q >= min_den and p >= min_num and inside((p, q)):
+                yield p, q
+            continue
+        if too_big(p, q):
+            continue
+        mid = (p, q)
+        if _less(mid, hi):
+            stack.append((mid, right, False))       # right subtree: (mid, right)
+        stack.append((left, right, True))
+        if _less(lo, mid):
+            stack.append((left, mid, False))        # left subtree: (left, mid)
+
+
+def count_fractions(lo=0, hi=INFINITY, **bounds):
+    """Number of fractions reduced_fractions would yield."""
+    return sum(1 for _ in reduced_fractions(lo, hi, **bounds))
+
+
+def sample_fractions(n, lo=0, hi=INFINITY, seed=None, sort=False, **bounds):
+    """
+    Yield exactly n distinct reduced fractions (p, q) chosen uniformly from
+    reduced_fractions(lo, hi, **bounds). Same seed, same fractions in the
+    same order; sort=True yields them in increasing order instead.
+    """
+    total = count_fractions(lo, hi, **bounds)
+    if n > total:
+        raise ValueError("only {0} fractions satisfy the bounds, {1} requested".format(total, n))
+    ranks = random.Random(seed).sample(range(total), n)
+    slot = {rank: i for i, rank in enumerate(ranks)}
+    picked = [None] * n
+    wanted = sorted(ranks)
+    j = 0
+    for rank, frac in enumerate(reduced_fractions(lo, hi, **bounds)):
+        if j == n:
+            break
+        if rank == wanted[j]:
+            if sort:
+                yield frac
+            else:
+                picked[slot[rank]] = frac
+            j += 1
+    if not sort:
+        yield from picked
+
+
+if __name__ == "__main__":
+    print(list(reduced_fractions(1, 2, max_den=5)))
+    print(count_fractions(0, 1, max_den=100))        # |Farey sequence F_100| - 2 = 3043
+    print(list(sample_fractions(5, 2, INFINITY, seed=1, min_num=5, max_num=19, min_den=2, max_den=14)))